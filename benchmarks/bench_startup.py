@@ -0,0 +1,84 @@
+"""Measure time-to-first-window for each demo entry point.
+
+Every run starts a fresh interpreter so imports are cold, builds the
+DemoApp, shows it and processes pending events. Run from the repository
+root:
+
+    python benchmarks/bench_startup.py --repeat 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DEMOS = ["dem4_stocks", "dem5_read_csv", "dem6_main", "dem7_stock_history"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints import and window timings as JSON
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module} as demo_module
+t1 = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+window = demo_module.DemoApp()
+window.show()
+app.processEvents()
+t2 = time.perf_counter()
+# Let background loads finish before the interpreter tears Qt down
+loader = getattr(window, "loader", None)
+if loader is not None:
+    loader.shutdown()
+print(json.dumps({{"import_ms": (t1 - t0) * 1000, "window_ms": (t2 - t1) * 1000,
+                  "heavy_modules": sorted(m for m in ("pandas", "numpy") if m in sys.modules)}}))
+"""
+
+
+def run_once(module, platform):
+    """Start one demo in a fresh interpreter and return its timings."""
+    env = dict(os.environ, QT_QPA_PLATFORM=platform)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(module=module)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    total_ms = (time.perf_counter() - start) * 1000
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["total_ms"] = total_ms
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("demos", nargs="*", default=DEMOS, help="demo modules to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per demo (median is reported)")
+    parser.add_argument("--platform", default="offscreen", help="Qt platform plugin to use")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'demo':<22}{'import ms':>11}{'window ms':>11}{'total ms':>11}  heavy modules")
+    for module in args.demos:
+        runs = [run_once(module, args.platform) for _ in range(args.repeat)]
+        summary = {
+            key: statistics.median(run[key] for run in runs)
+            for key in ("import_ms", "window_ms", "total_ms")
+        }
+        summary["heavy_modules"] = runs[-1]["heavy_modules"]
+        summary["runs"] = runs
+        results[module] = summary
+        print(f"{module:<22}{summary['import_ms']:>11.1f}{summary['window_ms']:>11.1f}"
+              f"{summary['total_ms']:>11.1f}  {', '.join(summary['heavy_modules']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version, "platform": args.platform, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Time the table population paths of the demos on synthetic data.
+
+Synthetic constituent and history CSVs are written to a scratch directory
+at each requested size, then display_csv_in_stocks_panel (dem5, dem6,
+dem7) and display_stock_history (dem7) are timed end to end: parse,
+populate and first paint of the table viewport. dem7 loads in the
+background, so its timings include waiting for the loader channel of the
+table; the chart that display_stock_history builds on its own channel (the
+OHLC pyramid) is timed separately. Runs under the offscreen Qt platform
+unless QT_QPA_PLATFORM is already set.
+
+    python benchmarks/bench_tables.py --sizes 100 10000 1000000 --json tables.json
+"""
+import argparse
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtWidgets import QApplication
+
+from session import SESSION_PATH
+
+INDEX_DEMOS = ["dem5_read_csv", "dem6_main", "dem7_stock_history"]
+HISTORY_DEMOS = ["dem7_stock_history"]
+INDEX_NAME = "S&P 500"
+SYMBOL = "BENCH"
+
+
+def write_index_csv(file_path, rows, rng):
+    """Write a constituent list shaped like data/summary/wikipedia_*.csv."""
+    sectors = np.array(["Information Technology", "Health Care", "Financials", "Energy", "Utilities"])
+    symbols = np.char.add("S", np.arange(rows).astype(str))
+    symbols[0] = SYMBOL
+    pd.DataFrame({
+        "Symbol": symbols,
+        "Security": np.char.add(symbols, " Corp"),
+        "GICS Sector": sectors[rng.integers(0, len(sectors), rows)],
+        "GICS Sub-Industry": np.char.add("Sub-Industry ", rng.integers(0, 150, rows).astype(str)),
+        "Headquarters Location": "New York, New York",
+        "Date added": pd.Timestamp("1990-01-01") + pd.to_timedelta(rng.integers(0, 12000, rows), unit="D"),
+        "CIK": rng.integers(1000, 2_000_000, rows),
+        "Founded": rng.integers(1850, 2020, rows),
+    }).to_csv(file_path, index=False)
+
+
+def write_history_csv(file_path, rows, rng):
+    """Write an OHLCV history shaped like data/history/{symbol}.csv.
+
+    Minute bars are used so that a million rows still fit pandas' date range.
+    """
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    pd.DataFrame({
+        "Date": pd.date_range(end="2024-12-31 16:00", periods=rows, freq="min").strftime("%Y-%m-%d %H:%M:%S"),
+        "Open": close * (1 + rng.normal(0, 0.002, rows)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Adj Close": close,
+        "Volume": rng.integers(100_000, 10_000_000, rows),
+    }).to_csv(file_path, index=False)
+
+
+def write_dataset(work_dir, rows):
+    """Create data/summary and data/history under work_dir with rows per file."""
+    rng = np.random.default_rng(rows)
+    os.makedirs(os.path.join(work_dir, "data", "summary"), exist_ok=True)
+    os.makedirs(os.path.join(work_dir, "data", "history"), exist_ok=True)
+    for name in ("sp500", "nasdaq", "dowjones"):
+        write_index_csv(os.path.join(work_dir, "data", "summary", f"wikipedia_{name}.csv"), rows, rng)
+    write_history_csv(os.path.join(work_dir, "data", "history", f"{SYMBOL}.csv"), rows, rng)
+
+
+def reset_caches(work_dir):
+    """Forget every parsed or converted file so the next load is cold."""
+    shutil.rmtree(os.path.join(work_dir, "data", "store"), ignore_errors=True)
+    shutil.rmtree(os.path.join(work_dir, "data", "panel"), ignore_errors=True)
+    shutil.rmtree(os.path.join(work_dir, "data", "pyramid"), ignore_errors=True)
+    if "df_cache" in sys.modules:
+        sys.modules["df_cache"].shared_cache.clear()
+
+
+def forget_session(work_dir):
+    """Remove the session dem7 saves on close, so the next window does not restore it."""
+    try:
+        os.remove(os.path.join(work_dir, SESSION_PATH))
+    except OSError:
+        pass
+
+
+def wait_for(app, window, channels=None, timeout=600):
+    """Process events until the window's background loader is idle on channels (default: all)."""
+    loader = getattr(window, "loader", None)
+
+    def busy():
+        if channels is None:
+            return loader.is_busy()
+        return any(loader.is_loading(channel) for channel in channels)
+
+    deadline = time.perf_counter() + timeout
+    app.processEvents()
+    while loader is not None and busy():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("loader did not finish")
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def time_path(app, window, action, view_name, channel):
+    """Return (total_ms, paint_ms, idle_ms) for action followed by a repaint of the view.
+
+    total_ms waits only for the table's loader channel; idle_ms is the time
+    until every other channel (such as the chart) has finished as well.
+    """
+    start = time.perf_counter()
+    action()
+    wait_for(app, window, [channel])
+    painted = time.perf_counter()
+    getattr(window, view_name).viewport().repaint()
+    end = time.perf_counter()
+    wait_for(app, window)
+    idle = time.perf_counter()
+    return (end - start) * 1000, (end - painted) * 1000, (idle - start) * 1000
+
+
+def bench(app, module_name, path, rows, work_dir):
+    """Time one demo display path cold and warm; return a result dict."""
+    module = importlib.import_module(module_name)
+    forget_session(work_dir)
+    window = module.DemoApp()
+    window.show()
+    wait_for(app, window)
+
+    if path == "index":
+        action = lambda: window.display_csv_in_stocks_panel(INDEX_NAME)
+        view_name = "stocks_panel"
+    else:
+        action = lambda: window.display_stock_history(SYMBOL)
+        view_name = "stock_history_panel"
+
+    reset_caches(work_dir)
+    cold_ms, cold_paint_ms, cold_idle_ms = time_path(app, window, action, view_name, path)
+    warm_ms, warm_paint_ms, warm_idle_ms = time_path(app, window, action, view_name, path)
+    shown_rows = getattr(window, view_name).model().rowCount()
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return {
+        "demo": module_name,
+        "path": "display_csv_in_stocks_panel" if path == "index" else "display_stock_history",
+        "rows": rows,
+        "shown_rows": shown_rows,
+        "cold_ms": cold_ms,
+        "cold_paint_ms": cold_paint_ms,
+        "warm_ms": warm_ms,
+        "warm_paint_ms": warm_paint_ms,
+        "cold_idle_ms": cold_idle_ms,
+        "warm_idle_ms": warm_idle_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000],
+                        help="rows per synthetic file")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directory")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    work_dir = tempfile.mkdtemp(prefix="xpyqt6-bench-")
+    old_cwd = os.getcwd()
+    results = []
+    print(f"{'demo':<20}{'path':<30}{'rows':>9}{'cold ms':>10}{'warm ms':>10}{'paint ms':>10}{'idle ms':>10}")
+    try:
+        # The demos open data/... relative to the working directory
+        os.chdir(work_dir)
+        for rows in args.sizes:
+            write_dataset(work_dir, rows)
+            jobs = [(m, "index") for m in INDEX_DEMOS] + [(m, "history") for m in HISTORY_DEMOS]
+            for module_name, path in jobs:
+                result = bench(app, module_name, path, rows, work_dir)
+                results.append(result)
+                print(f"{result['demo']:<20}{result['path']:<30}{rows:>9}"
+                      f"{result['cold_ms']:>10.1f}{result['warm_ms']:>10.1f}{result['cold_paint_ms']:>10.1f}"
+                      f"{result['cold_idle_ms']:>10.1f}")
+    finally:
+        os.chdir(old_cwd)
+        if args.keep:
+            print(f"[INFO] Synthetic data kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "python": sys.version,
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "platform": os.environ["QT_QPA_PLATFORM"],
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
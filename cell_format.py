@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# Column names that get a fixed display format, including the screener metrics (see screener.py)
+PRICE_COLUMNS = {"Open", "High", "Low", "Close", "Adj Close",
+                 "Last Close", "1M Return %", "1Y Return %", "Volatility %"}
+VOLUME_COLUMNS = {"Volume", "Avg Volume"}
+# Indicator columns (see indicators.py) are price-like too
+PRICE_PREFIXES = ("SMA(", "EMA(", "RSI(", "BB ", "ATR(")
+PRICE_FORMAT = "%.2f"
+
+
+def _with_thousands(strings):
+    """Insert thousands separators into an array of integer strings."""
+    return pd.Series(strings, dtype=object).str.replace(r"\B(?=(\d{3})+(?!\d))", ",", regex=True).to_numpy()
+
+
+def _format_floats(values):
+    """Format floats losslessly: whole numbers without a decimal part, others as repr."""
+    strings = values.astype(str).astype(object)
+    whole = np.isfinite(values)
+    whole[whole] = values[whole] % 1 == 0
+    strings[whole] = np.char.mod("%.0f", values[whole]).astype(object)
+    return strings
+
+
+def format_dates(values):
+    """Format datetime64 values as ISO dates, or ISO timestamps if any has a time."""
+    missing = np.isnat(values)
+    unit = "D"
+    seconds = values[~missing].astype("datetime64[s]")
+    if len(seconds) and (seconds != seconds.astype("datetime64[D]")).any():
+        unit = "s"
+    strings = np.datetime_as_string(values, unit=unit).astype(object)
+    strings[missing] = ""
+    return strings
+
+
+def format_column(name, values):
+    """Return display strings for a whole column (or block) of values at once.
+
+    Prices get fixed decimals, volumes thousands separators and datetimes ISO
+    dates; other numbers and strings keep their natural form (floats are
+    never rounded). Missing values become empty strings.
+    """
+    values = np.asarray(values)
+    kind = values.dtype.kind
+
+    if kind == "M":
+        return format_dates(values)
+
+    if kind in "iu":
+        strings = values.astype(str).astype(object)
+        return _with_thousands(strings) if name in VOLUME_COLUMNS else strings
+
+    if kind == "f":
+        missing = np.isnan(values)
+        if name in VOLUME_COLUMNS:
+            strings = _with_thousands(np.char.mod("%.0f", np.where(missing, 0, values)).astype(object))
+        elif name in PRICE_COLUMNS or str(name).startswith(PRICE_PREFIXES):
+            strings = np.char.mod(PRICE_FORMAT, values).astype(object)
+        else:
+            strings = _format_floats(values)
+        strings[missing] = ""
+        return strings
+
+    if kind == "b":
+        return values.astype(str).astype(object)
+
+    # Strings and other objects
+    strings = values.astype(str).astype(object)
+    strings[pd.isna(values)] = ""
+    return strings
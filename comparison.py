@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import span
+
+
+class Comparison:
+    """Histories of several symbols aligned on one date index.
+
+    aligned holds the closes (one column per symbol, NaN where a symbol has
+    no bar), rebased the closes from the first date on which every symbol
+    has a bar, scaled to 100 there, and correlation the correlation matrix
+    of their log returns per bar (of whatever resolution the histories have)
+    over that common period.
+    """
+
+    def __init__(self, aligned):
+        self.aligned = aligned
+        self.symbols = list(aligned.columns)
+        with span("compare.rebase", symbols=len(self.symbols)):
+            self.start, self.rebased = rebase(aligned)
+            self.correlation = correlations(self.rebased)
+
+
+def load_closes(file_paths, read_func, max_workers=8, field="Close"):
+    """Read the Date and field columns of several history files concurrently.
+
+    read_func(file_path) returns a DataFrame; the reads run on a thread pool
+    (parsing and the column store's I/O release the GIL). Returns a dict of
+    symbol -> Series of field indexed by date; unreadable files are left out.
+    """
+    def read(file_path):
+        try:
+            df = read_func(file_path)
+        except (OSError, ValueError):
+            return None
+        return pd.Series(df[field].to_numpy(dtype=float), index=pd.to_datetime(df["Date"]))
+
+    with span("compare.load", files=len(file_paths)), ThreadPoolExecutor(max_workers) as executor:
+        series = list(executor.map(read, file_paths))
+    return {
+        os.path.splitext(os.path.basename(file_path))[0]: closes
+        for file_path, closes in zip(file_paths, series) if closes is not None
+    }
+
+
+def align(closes):
+    """Outer-join a dict of symbol -> Series on their dates in a single concat."""
+    if not closes:
+        return pd.DataFrame(dtype=float)
+    with span("compare.align", symbols=len(closes)):
+        # Duplicate dates would make the join ambiguous; keep the last bar of each
+        closes = {symbol: s[~s.index.duplicated(keep="last")] for symbol, s in closes.items()}
+        return pd.concat(closes, axis=1, join="outer").sort_index()
+
+
+def rebase(aligned, base=100.0):
+    """Return (start date, closes from the first common date scaled to base there)."""
+    values = aligned.to_numpy(dtype=float)
+    common = np.flatnonzero(~np.isnan(values).any(axis=1))
+    if not len(common):
+        return None, aligned.iloc[:0]
+    first = common[0]
+    rebased = values[first:] / values[first] * base
+    return aligned.index[first], pd.DataFrame(rebased, index=aligned.index[first:], columns=aligned.columns)
+
+
+def correlations(rebased):
+    """Return the correlation matrix of the log returns of each column.
+
+    Only dates on which every symbol has a bar (and the one before) count.
+    """
+    values = rebased.to_numpy(dtype=float)
+    returns = np.diff(np.log(values), axis=0)
+    returns = returns[~np.isnan(returns).any(axis=1)]
+    if len(returns) < 2:
+        matrix = np.full((values.shape[1], values.shape[1]), np.nan)
+    else:
+        matrix = np.atleast_2d(np.corrcoef(returns, rowvar=False))
+    return pd.DataFrame(matrix, index=rebased.columns, columns=rebased.columns)
+
+
+def compare(file_paths, read_func, max_workers=8):
+    """Load several history files concurrently and return their Comparison."""
+    return Comparison(align(load_closes(file_paths, read_func, max_workers)))
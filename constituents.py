@@ -0,0 +1,85 @@
+import pandas as pd
+
+from instrumentation import count, span
+
+# Declared types of the data/summary/wikipedia_*.csv columns. "category" is for
+# repeated labels, "integer" for whole numbers (downcast to the smallest type)
+# and "date" for ISO dates; identifiers and names stay plain strings.
+CONSTITUENT_SCHEMA = {
+    "Symbol": "string",
+    "Security": "string",
+    "Company": "string",
+    "GICS Sector": "category",
+    "GICS Sub-Industry": "category",
+    "Headquarters Location": "category",
+    "Sector": "category",
+    "Industry": "category",
+    "Exchange": "category",
+    "Date added": "date",
+    "CIK": "integer",
+    "Founded": "integer",
+}
+
+# Undeclared string columns become categories when at most this share of values is distinct
+CATEGORY_RATIO = 0.5
+
+
+def _convert(series, kind):
+    """Return series converted to kind, or None if that would lose any value."""
+    if kind == "category":
+        return series.astype("category")
+    if kind == "integer":
+        converted = pd.to_numeric(series, errors="coerce")
+        if converted.hasnans or (converted % 1 != 0).any():
+            return None
+        return pd.to_numeric(converted, downcast="integer")
+    if kind == "date":
+        converted = pd.to_datetime(series, errors="coerce", format="ISO8601")
+        if converted.notna().sum() != series.notna().sum():
+            return None
+        return converted
+    return None
+
+
+def _infer(series):
+    """Return the kind an undeclared column is stored as, or None to keep it."""
+    kind = series.dtype.kind
+    if kind in "iu":
+        return "integer"
+    if kind == "O" and len(series) and series.nunique() <= CATEGORY_RATIO * len(series):
+        return "category"
+    return None
+
+
+def optimize_dtypes(df, schema=CONSTITUENT_SCHEMA):
+    """Return df with compact column types and record the memory it saved.
+
+    Columns named in schema get their declared kind; the others are inferred
+    (integers downcast, repetitive strings as categories). A column keeps its
+    type if the conversion would turn any value into a missing one (such as
+    a "Founded" of "2013 (1888)"). Float columns are left at float64, so no
+    displayed digit changes. The deep memory usage before and after is kept
+    in the result's attrs["memory_usage"].
+    """
+    with span("constituents.optimize", rows=len(df)):
+        before = int(df.memory_usage(deep=True).sum())
+        columns = {}
+        for name in df.columns:
+            series = df[name]
+            kind = schema.get(name) or _infer(series)
+            converted = None
+            if kind is not None and not isinstance(series.dtype, pd.CategoricalDtype):
+                converted = _convert(series, kind)
+            columns[name] = series if converted is None else converted
+        result = pd.DataFrame(columns, index=df.index)
+        after = int(result.memory_usage(deep=True).sum())
+    result.attrs["memory_usage"] = (before, after)
+    count("constituents.saved_bytes", before - after)
+    return result
+
+
+def constituent_reader(read):
+    """Wrap a CsvLoader read function so that it returns optimize_dtypes of its DataFrame."""
+    def read_optimized(file_path, report_progress, is_cancelled):
+        return optimize_dtypes(read(file_path, report_progress, is_cancelled))
+    return read_optimized
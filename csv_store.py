@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from csv_readers import read_csv_tail
+from file_helpers import save_array, save_json
+from instrumentation import count, span
+
+FORMAT_VERSION = 1
+
+
+class ColumnStore:
+    """Columnar binary copies of CSV files, one memory-mappable .npy per column.
+
+    Each CSV is converted once into a directory under root (for example
+    data/history/AAPL.csv -> data/store/history/AAPL/) holding one typed .npy
+    file per column and a meta.json that records the source mtime and size.
+    Loads memory-map the numeric columns, so repeated reads are near
+    zero-copy; a changed CSV is converted again on its next load, or in the
+    background after a load_tail.
+    """
+
+    def __init__(self, root="data/store"):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._pending = set()  # absolute paths being converted in the background
+
+    def store_dir(self, csv_path):
+        """Return the directory holding the columnar copy of csv_path."""
+        folder = os.path.basename(os.path.dirname(os.path.abspath(csv_path)))
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        return os.path.join(self.root, folder, name)
+
+    def read_meta(self, csv_path):
+        """Return the stored meta.json for csv_path, or None if there is none."""
+        try:
+            with open(os.path.join(self.store_dir(csv_path), "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, csv_path, meta=None):
+        """Return True if the columnar copy matches the current CSV."""
+        meta = meta or self.read_meta(csv_path)
+        if meta is None or meta.get("version") != FORMAT_VERSION:
+            return False
+        st = os.stat(csv_path)
+        return meta["source_mtime_ns"] == st.st_mtime_ns and meta["source_size"] == st.st_size
+
+    def convert(self, csv_path, df=None, parse=pd.read_csv):
+        """Write the columnar copy of csv_path and return its meta."""
+        with span("store.convert", file=csv_path):
+            return self._convert(csv_path, df, parse)
+
+    def _convert(self, csv_path, df, parse):
+        st = os.stat(csv_path)
+        if df is None:
+            df = parse(csv_path)
+        out_dir = self.store_dir(csv_path)
+        os.makedirs(out_dir, exist_ok=True)
+
+        columns = []
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            entry = {"name": str(name), "file": f"c{i}.npy", "kind": "numeric", "mask": None}
+            if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+                # Strings become fixed-width unicode arrays, which np.load can map
+                missing = series.isna().to_numpy()
+                values = series.where(~missing, "").astype(str).to_numpy().astype(str)
+                entry["kind"] = "string"
+                if missing.any():
+                    entry["mask"] = f"c{i}.mask.npy"
+                    save_array(os.path.join(out_dir, entry["mask"]), missing)
+            else:
+                values = series.to_numpy()
+            save_array(os.path.join(out_dir, entry["file"]), values)
+            columns.append(entry)
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "source": os.path.abspath(csv_path),
+            "source_mtime_ns": st.st_mtime_ns,
+            "source_size": st.st_size,
+            "rows": len(df),
+            "columns": columns,
+        }
+        # meta.json is written last; it marks the copy as complete
+        save_json(os.path.join(out_dir, "meta.json"), meta)
+        return meta
+
+    def load(self, csv_path, start=None, stop=None, parse=pd.read_csv):
+        """Return csv_path as a DataFrame read from its columnar copy.
+
+        The CSV is converted with parse first if the copy is missing or stale.
+        start and stop select a row range before any string column is
+        materialized.
+        """
+        with self._lock_for(csv_path):
+            meta = self.read_meta(csv_path)
+            if not self.is_fresh(csv_path, meta):
+                meta = self.convert(csv_path, parse=parse)
+        return self.read_columns(csv_path, meta, slice(start, stop))
+
+    def load_tail(self, csv_path, n_rows=100, convert=True):
+        """Return the last n_rows of csv_path without waiting for a conversion.
+
+        A fresh copy is read from the store; otherwise the tail is parsed from
+        the CSV (read_csv_tail) and, with convert, the copy is rewritten on a
+        background thread for the next load.
+        """
+        meta = self.read_meta(csv_path)
+        if self.is_fresh(csv_path, meta):
+            try:
+                rows = slice(0, 0) if n_rows <= 0 else slice(-n_rows, None)
+                return self.read_columns(csv_path, meta, rows)
+            except OSError:
+                pass
+        if convert:
+            self.convert_later(csv_path)
+        return read_csv_tail(csv_path, n_rows)
+
+    def convert_later(self, csv_path):
+        """Convert csv_path on a background thread, unless a conversion of it is pending."""
+        key = os.path.abspath(csv_path)
+        with self._locks_guard:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+
+        def run():
+            try:
+                with self._lock_for(csv_path):
+                    if not self.is_fresh(csv_path):
+                        self.convert(csv_path)
+            except Exception:
+                # Best effort: the next load converts or falls back to the CSV again
+                count("store.convert_failed")
+            finally:
+                with self._locks_guard:
+                    self._pending.discard(key)
+
+        threading.Thread(target=run, name="store-convert", daemon=True).start()
+
+    def read_columns(self, csv_path, meta, rows=slice(None)):
+        """Build a DataFrame from the stored columns described by meta."""
+        with span("store.read", file=csv_path):
+            return self._read_columns(csv_path, meta, rows)
+
+    def _read_columns(self, csv_path, meta, rows):
+        out_dir = self.store_dir(csv_path)
+        data = {}
+        for entry in meta["columns"]:
+            # A plain ndarray view keeps the mapping without exposing np.memmap
+            values = np.load(os.path.join(out_dir, entry["file"]), mmap_mode="r")[rows].view(np.ndarray)
+            if entry["kind"] == "string":
+                values = values.astype(object)
+                if entry["mask"]:
+                    missing = np.load(os.path.join(out_dir, entry["mask"]), mmap_mode="r")[rows]
+                    values[missing] = np.nan
+            data[entry["name"]] = values
+        return pd.DataFrame(data, copy=False)
+
+    def _lock_for(self, csv_path):
+        key = os.path.abspath(csv_path)
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+
+# Store shared by every window in the process
+shared_store = ColumnStore()
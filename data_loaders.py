@@ -0,0 +1,165 @@
+import os
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from instrumentation import span
+
+
+class LoadCancelled(Exception):
+    """Raised inside a read function when its request has been replaced."""
+
+
+def read_csv_with_progress(file_path, report_progress, is_cancelled, chunksize=50_000):
+    """Read a CSV in chunks, reporting the percentage of bytes consumed."""
+    import pandas as pd
+
+    total = os.path.getsize(file_path) or 1
+    chunks = []
+    with span("csv.parse", file=file_path), open(file_path, "rb") as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize):
+            if is_cancelled():
+                raise LoadCancelled(file_path)
+            chunks.append(chunk)
+            report_progress(min(99, int(f.tell() * 100 / total)))
+        if not chunks:
+            return pd.read_csv(file_path)
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks)
+
+
+def simple_reader(read_func, *args, **kwargs):
+    """Adapt a plain read_func(file_path, ...) for use with CsvLoader.load."""
+    def read(file_path, report_progress, is_cancelled):
+        return read_func(file_path, *args, **kwargs)
+    return read
+
+
+def store_reader(store, parse=read_csv_with_progress):
+    """Adapt store.load for CsvLoader.load, reporting progress while converting."""
+    def read(file_path, report_progress, is_cancelled):
+        return store.load(file_path, parse=lambda path: parse(path, report_progress, is_cancelled))
+    return read
+
+
+class LoaderSignals(QObject):
+    """Signals emitted by a CsvLoadTask from its worker thread."""
+    progress = pyqtSignal(int, int)          # request_id, percent
+    finished = pyqtSignal(int, object)       # request_id, result of the read function
+    failed = pyqtSignal(int, object)         # request_id, exception
+
+
+class CsvLoadTask(QRunnable):
+    """Run the read function of one file on a QThreadPool worker."""
+
+    def __init__(self, request_id, file_path, read_func):
+        super().__init__()
+        self.request_id = request_id
+        self.file_path = file_path
+        self.read_func = read_func
+        self.signals = LoaderSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask the task to stop and drop its result."""
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def run(self):
+        if self.is_cancelled():
+            return
+        try:
+            result = self.read_func(
+                self.file_path,
+                lambda percent: self._emit(self.signals.progress, percent),
+                self.is_cancelled,
+            )
+        except LoadCancelled:
+            return
+        except Exception as e:
+            self._emit(self.signals.failed, e)
+            return
+        self._emit(self.signals.finished, result)
+
+    def _emit(self, signal, value):
+        if self.is_cancelled():
+            return
+        try:
+            signal.emit(self.request_id, value)
+        except RuntimeError:
+            # The signals object went away with the application during shutdown
+            pass
+
+
+class CsvLoader(QObject):
+    """Load files in the background, keeping only the newest request per channel.
+
+    A channel names one consumer of the data (for example "index" or "history");
+    starting a new load on a channel cancels the one it replaces. The result
+    delivered by loaded is whatever the read function returns: a DataFrame
+    by default, but any object for other readers (such as the symbol index).
+    """
+    started = pyqtSignal(str, str)               # channel, file_path
+    progress = pyqtSignal(str, int)              # channel, percent
+    loaded = pyqtSignal(str, str, object)        # channel, file_path, result
+    failed = pyqtSignal(str, str, object)        # channel, file_path, exception
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self._pool = pool or QThreadPool.globalInstance()
+        self._next_id = 0
+        self._current = {}  # channel -> CsvLoadTask
+
+    def load(self, channel, file_path, read_func=read_csv_with_progress):
+        """Start loading file_path for channel and return the request id."""
+        self.cancel(channel)
+        self._next_id += 1
+        task = CsvLoadTask(self._next_id, file_path, read_func)
+        task.signals.progress.connect(lambda request_id, percent: self._on_progress(channel, request_id, percent))
+        task.signals.finished.connect(lambda request_id, result: self._on_finished(channel, request_id, result))
+        task.signals.failed.connect(lambda request_id, error: self._on_failed(channel, request_id, error))
+        self._current[channel] = task
+        self.started.emit(channel, file_path)
+        self._pool.start(task)
+        return task.request_id
+
+    def cancel(self, channel):
+        """Cancel the pending request on channel, if any."""
+        task = self._current.pop(channel, None)
+        if task is not None:
+            task.cancel()
+
+    def shutdown(self):
+        """Cancel every channel and wait for the running tasks to finish."""
+        for channel in list(self._current):
+            self.cancel(channel)
+        self._pool.waitForDone()
+
+    def is_loading(self, channel):
+        """Return True while channel has a pending request."""
+        return channel in self._current
+
+    def is_busy(self):
+        """Return True while any channel has a pending request."""
+        return bool(self._current)
+
+    def _is_current(self, channel, request_id):
+        task = self._current.get(channel)
+        return task is not None and task.request_id == request_id
+
+    def _on_progress(self, channel, request_id, percent):
+        if self._is_current(channel, request_id):
+            self.progress.emit(channel, percent)
+
+    def _on_finished(self, channel, request_id, result):
+        if self._is_current(channel, request_id):
+            task = self._current.pop(channel)
+            self.loaded.emit(channel, task.file_path, result)
+
+    def _on_failed(self, channel, request_id, error):
+        if self._is_current(channel, request_id):
+            task = self._current.pop(channel)
+            self.failed.emit(channel, task.file_path, error)
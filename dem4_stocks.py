@@ -1,5 +1,4 @@
 import sys
-import pandas as pd
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QToolBar,
     QStatusBar, QLabel, QListWidget, QTextEdit, QTableWidget, QTableWidgetItem
@@ -164,9 +163,16 @@ class DemoApp(QMainWindow):
         main_panel_layout.addWidget(self.main_panel_text)
         horizontal_layout.addWidget(self.main_panel)
 
-        # Stocks Panel (for CSV display)
-        self.stocks_panel = QTableWidget()
-        main_layout.addWidget(self.stocks_panel)
+        # Stocks Panel (for CSV display), built on first use
+        self.main_layout = main_layout
+        self.stocks_panel = None
+
+    def ensure_stocks_panel(self):
+        """Create the Stocks Panel the first time it is needed."""
+        if self.stocks_panel is None:
+            self.stocks_panel = QTableWidget()
+            self.main_layout.addWidget(self.stocks_panel)
+        return self.stocks_panel
 
     def display_items_in_main_panel(self, item):
         """Display the objects or overview related to the clicked side panel item."""
@@ -185,10 +191,12 @@ class DemoApp(QMainWindow):
             return
 
         try:
-            # Load CSV file using pandas
+            # Load CSV file using pandas (imported on first use to keep startup fast)
+            import pandas as pd
             df = pd.read_csv(file_path)
 
             # Display in the QTableWidget
+            self.ensure_stocks_panel()
             self.stocks_panel.setRowCount(len(df))
             self.stocks_panel.setColumnCount(len(df.columns))
             self.stocks_panel.setHorizontalHeaderLabels(df.columns)
@@ -1,11 +1,11 @@
 import sys
-import pandas as pd
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QToolBar,
-    QStatusBar, QLabel, QListWidget, QPushButton, QTextEdit, QTableWidget, QTableWidgetItem
+    QStatusBar, QLabel, QListWidget, QPushButton, QTextEdit, QTableView
 )
 from PyQt6.QtGui import QAction
 from PyQt6.QtCore import Qt
+from table_models import ChunkedCsvTableModel
 
 
 class DemoApp(QMainWindow):
@@ -82,9 +82,19 @@ class DemoApp(QMainWindow):
         main_panel_layout.addLayout(self.button_layout)
         horizontal_layout.addWidget(self.main_panel)
 
-        # Stocks Panel (for CSV display)
-        self.stocks_panel = QTableWidget()
-        main_layout.addWidget(self.stocks_panel)
+        # Stocks Panel (for CSV display), built on first use
+        self.main_layout = main_layout
+        self.stocks_panel = None
+        self.stocks_model = None
+
+    def ensure_stocks_panel(self):
+        """Create the Stocks Panel the first time it is needed."""
+        if self.stocks_panel is None:
+            self.stocks_model = ChunkedCsvTableModel()
+            self.stocks_panel = QTableView()
+            self.stocks_panel.setModel(self.stocks_model)
+            self.main_layout.addWidget(self.stocks_panel)
+        return self.stocks_panel
 
     def create_stock_buttons(self):
         #"""Create buttons for S&P 500, Nasdaq, and Dow Jones."""
@@ -121,17 +131,9 @@ Represents blue-chip companies and is a narrower index.
             return
 
         try:
-            # Load CSV file using pandas
-            df = pd.read_csv(file_path)
-
-            # Display in the QTableWidget
-            self.stocks_panel.setRowCount(len(df))
-            self.stocks_panel.setColumnCount(len(df.columns))
-            self.stocks_panel.setHorizontalHeaderLabels(df.columns)
-
-            for row_idx, row in df.iterrows():
-                for col_idx, value in enumerate(row):
-                    self.stocks_panel.setItem(row_idx, col_idx, QTableWidgetItem(str(value)))
+            # Display in the QTableView; further chunks are parsed as the view scrolls
+            self.ensure_stocks_panel()
+            self.stocks_model.set_file(file_path)
 
         except FileNotFoundError:
             self.main_panel_text.setText(f"File not found: {file_path}")
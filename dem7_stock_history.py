@@ -1,10 +1,25 @@
+import os
 import sys
-import pandas as pd
+from collections import deque
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel,
-    QListWidget, QPushButton, QTextEdit, QTableWidget, QTableWidgetItem
+    QListWidget, QPushButton, QTextEdit, QTableView, QFileDialog, QLineEdit, QCompleter
 )
-from ui_helpers import init_menu_bar, init_tool_bar, init_status_bar
+from PyQt6.QtCore import Qt, QStringListModel, QTimer
+from PyQt6.QtGui import QAction, QActionGroup
+from ui_helpers import (
+    init_menu_bar, init_tool_bar, init_status_bar, init_timing_label, connect_loader_status
+)
+from table_models import DataFrameTableModel
+from data_loaders import CsvLoader, simple_reader, store_reader
+from df_cache import cached_reader, file_key
+from instrumentation import tracer
+from prefetch import HistoryPrefetcher
+from symbol_index import SymbolIndex
+from file_watcher import CsvTailWatcher
+from price_chart import PriceChart
+from tick_stream import CsvReplaySource, StreamTableModel, TickStreamer
+from session import load_session, save_session
 
 
 class DemoApp(QMainWindow):
@@ -28,12 +43,309 @@ class DemoApp(QMainWindow):
             "Dow Jones": "data/summary/wikipedia_dowjones.csv",
         }
 
+        # Consolidated history panels (built with ohlcv_panel.py)
+        self.panel_names = {
+            "S&P 500": "sp500",
+            "Nasdaq Composite": "nasdaq",
+            "Dow Jones": "dowjones",
+        }
+        self.panel = None
+
+        # Background CSV loader (parses off the UI thread)
+        self.loader = CsvLoader(self)
+        self.loader.loaded.connect(self.handle_data_loaded)
+        self.loader.failed.connect(self.handle_data_failed)
+        self.read_csv = None
+        self.read_index = None
+        self.read_history = None
+        self.prefetcher = None
+        self.symbol_index = None
+        self.search_results = {}
+
+        # Pick up rows appended to the shown index and history files
+        self.watcher = CsvTailWatcher(parent=self)
+        self.watcher.appended.connect(self.handle_rows_appended)
+        self.watcher.rewritten.connect(self.handle_file_rewritten)
+        self.index_name = None
+        self.history_symbol = None
+
+        # Chart resolution: the finest OHLC pyramid level with at most this many visible bars
+        self.chart_row_budget = 2000
+        self.pyramid = None
+        self.chart_level = None
+        self.chart_dates = None
+
+        # Screener columns for the Stocks Panel, computed on a process pool
+        self.screener = None
+        self.index_frame = None
+
+        # Technical indicator columns for the Stock History Panel, memoized per data version
+        self.indicator_engine = None
+        self.history_frame = None
+        self.history_version = None
+
+        # History window read for the Stock History Panel: menu label -> period back
+        # from the last bar (None: the last 100 bars), and the columns (None: all)
+        self.history_windows = {
+            "Last 100 Bars": None,
+            "Last Month": "31D",
+            "Last Quarter": "92D",
+            "Last Year": "366D",
+        }
+        self.history_period = None
+        self.history_columns = None
+
+        # Live tick stream shown in the Stock History Panel (replayed from history)
+        self.stream_rate = 5000
+        self.streamer = None
+
+        # Start times of pending loads, per loader channel
+        self.request_started = {}
+
         # Initialize UI components
-        init_menu_bar(self)
+        menu_bar = init_menu_bar(self)
         init_tool_bar(self)
-        init_status_bar(self)
+        status_bar = init_status_bar(self)
+        connect_loader_status(self.loader, status_bar)
+        self.timing_label = init_timing_label(status_bar)
+        self.init_profiling_menu(menu_bar)
+        self.init_stream_menu(menu_bar)
+        self.init_history_menu(menu_bar)
+        self.init_indicator_menu(menu_bar)
+        self.init_screener_menu(menu_bar)
+        self.init_compare_menu(menu_bar)
         self.init_layout()
 
+        # Reopen the index and symbol of the last session from the column store
+        self.recent_symbols = deque(maxlen=10)
+        self.session = load_session()
+        if self.session:
+            QTimer.singleShot(0, self.restore_session)
+
+    def session_state(self):
+        """Return the snapshot of the current view saved on exit."""
+        state = {
+            "index": self.index_name,
+            "symbol": self.history_symbol,
+            "recent_symbols": list(self.recent_symbols),
+            "screener": self.screener_action.isChecked(),
+            "indicators": self.indicator_action.isChecked(),
+            "history_period": self.history_period,
+            "history_columns": self.history_columns,
+        }
+        if self.stocks_panel is not None:
+            header = self.stocks_panel.horizontalHeader()
+            state["filter"] = self.symbol_filter.text()
+            ascending = header.sortIndicatorOrder() == Qt.SortOrder.AscendingOrder
+            state["sort"] = [header.sortIndicatorSection(), ascending]
+        return state
+
+    def restore_session(self):
+        """Reopen the view saved by the last session."""
+        session = self.session
+        self.screener_action.setChecked(bool(session.get("screener")))
+        self.indicator_action.setChecked(bool(session.get("indicators")))
+        action = self.history_window_actions.get(session.get("history_period"))
+        if action is not None:
+            action.setChecked(True)
+        self.history_columns_action.setChecked(bool(session.get("history_columns")))
+        index_name = session.get("index")
+        if index_name not in self.csv_files:
+            return
+
+        self.ensure_stock_panels()
+        self.symbol_filter.setText(session.get("filter") or "")
+        column, ascending = session.get("sort") or (-1, True)
+        order = Qt.SortOrder.AscendingOrder if ascending else Qt.SortOrder.DescendingOrder
+        self.stocks_panel.horizontalHeader().setSortIndicator(column, order)
+        self.display_csv_in_stocks_panel(index_name)
+
+        self.recent_symbols.extend(session.get("recent_symbols") or [])
+        symbol = session.get("symbol")
+        if symbol:
+            self.display_stock_history(symbol)
+        # Warm the memory cache with the other recently viewed histories
+        self.prefetcher.prefetch_symbols([s for s in self.recent_symbols if s != symbol])
+
+    def init_profiling_menu(self, menu_bar):
+        """Add a Profiling menu for exporting the recorded timings."""
+        profiling_menu = menu_bar.addMenu("Profiling")
+        export_action = QAction("Export Chrome Trace...", self)
+        export_action.triggered.connect(self.export_trace)
+        profiling_menu.addAction(export_action)
+
+    def init_stream_menu(self, menu_bar):
+        """Add a Stream menu for replaying the shown symbol as a live tick stream."""
+        stream_menu = menu_bar.addMenu("Stream")
+        self.stream_action = QAction("Replay Symbol History Live", self)
+        self.stream_action.setCheckable(True)
+        self.stream_action.toggled.connect(self.toggle_stream)
+        stream_menu.addAction(self.stream_action)
+
+    def init_history_menu(self, menu_bar):
+        """Add a History menu choosing the date window and columns read for the Stock History Panel."""
+        history_menu = menu_bar.addMenu("History")
+        window_group = QActionGroup(self)
+        self.history_window_actions = {}
+        for label, period in self.history_windows.items():
+            action = QAction(label, self)
+            action.setCheckable(True)
+            action.setChecked(period is None)
+            action.toggled.connect(lambda checked, period=period: checked and self.set_history_window(period))
+            window_group.addAction(action)
+            history_menu.addAction(action)
+            self.history_window_actions[period] = action
+        history_menu.addSeparator()
+        self.history_columns_action = QAction("Close and Volume Only", self)
+        self.history_columns_action.setCheckable(True)
+        self.history_columns_action.toggled.connect(
+            lambda checked: self.set_history_window(self.history_period, ("Close", "Volume") if checked else None)
+        )
+        history_menu.addAction(self.history_columns_action)
+
+    def set_history_window(self, period, columns=False):
+        """Read period (and columns, unless False) of the shown symbol's history from now on."""
+        self.history_period = period
+        if columns is not False:
+            self.history_columns = columns
+        if self.history_symbol:
+            self.display_stock_history(self.history_symbol)
+
+    def init_indicator_menu(self, menu_bar):
+        """Add an Indicators menu for showing indicator columns in the Stock History Panel."""
+        indicator_menu = menu_bar.addMenu("Indicators")
+        self.indicator_action = QAction("Show SMA/EMA/RSI/Bollinger/ATR", self)
+        self.indicator_action.setCheckable(True)
+        self.indicator_action.toggled.connect(lambda checked: self.show_history_frame())
+        indicator_menu.addAction(self.indicator_action)
+
+    def init_screener_menu(self, menu_bar):
+        """Add a Screener menu for joining history metrics onto the Stocks Panel."""
+        screener_menu = menu_bar.addMenu("Screener")
+        self.screener_action = QAction("Show Return/Volatility/Volume Columns", self)
+        self.screener_action.setCheckable(True)
+        self.screener_action.toggled.connect(self.toggle_screener)
+        screener_menu.addAction(self.screener_action)
+
+    def toggle_screener(self, checked):
+        """Add or remove the screener columns of the shown index."""
+        if self.index_frame is None:
+            return
+        if checked:
+            self.run_screener()
+        else:
+            self.loader.cancel("screener")
+            self.stocks_model.set_dataframe(self.index_frame)
+
+    def run_screener(self):
+        """Compute the screener metrics of the shown index's constituents in the background."""
+        if self.screener is None:
+            from screener import Screener
+            self.screener = Screener()
+        screener = self.screener
+        symbols = self.index_frame["Symbol"].astype(str).tolist()
+        self.request_started["screener"] = tracer.start()
+        self.loader.load("screener", self.csv_files[self.index_name],
+                         lambda file_path, report_progress, is_cancelled: screener.metrics(symbols, is_cancelled))
+
+    def init_compare_menu(self, menu_bar):
+        """Add a Compare menu for viewing the selected symbols side by side."""
+        compare_menu = menu_bar.addMenu("Compare")
+        compare_action = QAction("Compare Selected Symbols", self)
+        compare_action.setShortcut("Ctrl+M")
+        compare_action.triggered.connect(self.compare_selected)
+        compare_menu.addAction(compare_action)
+
+    def compare_selected(self):
+        """Load the histories of the symbols selected in the Stocks Panel concurrently and compare them."""
+        if self.stocks_panel is None:
+            return
+        rows = sorted({index.row() for index in self.stocks_panel.selectionModel().selectedIndexes()})
+        symbols = list(dict.fromkeys(self.stocks_model.index(row, 0).data() for row in rows))
+        if len(symbols) < 2:
+            self.main_panel_text.setText("Select two or more symbols in the Stocks Panel to compare.")
+            return
+
+        from comparison import compare
+        self.stream_action.setChecked(False)
+        self.loader.cancel("history")
+        self.loader.cancel("chart")
+        read_csv = self.read_csv
+        paths = [self.history_path(symbol) for symbol in symbols]
+
+        def read_comparison(file_path, report_progress, is_cancelled):
+            return compare(paths, lambda path: read_csv(path, lambda percent: None, is_cancelled))
+
+        self.request_started["compare"] = tracer.start()
+        self.loader.load("compare", f"data/history ({len(symbols)} symbols)", read_comparison)
+
+    def show_comparison(self, comparison):
+        """Show rebased histories in the Stock History Panel and chart, correlations in the Main Panel."""
+        # Not a single symbol's history any more: nothing to append to or annotate
+        self.history_symbol = None
+        self.history_frame = None
+        self.pyramid = None
+        self.chart_level = None
+        if comparison.start is None:
+            self.main_panel_text.setText("The selected symbols have no dates in common.")
+            self.stock_history_model.clear()
+            self.price_chart.clear()
+            return
+
+        rebased = comparison.rebased
+        with tracer.span("table.populate", rows=len(rebased)):
+            self.stock_history_model.set_dataframe(rebased.rename_axis("Date").reset_index())
+        start = str(comparison.start.date())
+        self.chart_dates = rebased.index.to_numpy().astype("datetime64[s]")
+        self.price_chart.set_series(rebased.to_numpy(), self.chart_dates, title=f"Rebased to 100 on {start}",
+                                    names=comparison.symbols)
+        self.main_panel_label.setText("Main Panel: Comparison")
+        self.main_panel_text.setText(
+            f"Correlation of log returns per bar since {start}:\n\n{comparison.correlation.round(2).to_string()}"
+        )
+
+    def toggle_stream(self, checked):
+        """Start or stop streaming the shown symbol into the Stock History Panel."""
+        if not checked:
+            self.stop_stream()
+            return
+        if not self.history_symbol:
+            self.main_panel_text.setText("Select a symbol to stream first.")
+            self.stream_action.setChecked(False)
+            return
+
+        try:
+            source = CsvReplaySource(self.history_path(self.history_symbol), rate=self.stream_rate)
+        except (OSError, ValueError) as e:
+            self.main_panel_text.setText(f"Error: {e}")
+            self.stream_action.setChecked(False)
+            return
+        if self.streamer is None:
+            self.stream_model = StreamTableModel(capacity=100, parent=self)
+            self.streamer = TickStreamer(self.stream_model, fps=30, parent=self)
+            self.streamer.flushed.connect(lambda ticks: self.show_timings(["stream.flush"]))
+        self.stock_history_panel.setModel(self.stream_model)
+        self.streamer.start(source)
+        self.statusBar().showMessage(f"Streaming {self.history_symbol} at {self.stream_rate} ticks/s")
+
+    def stop_stream(self):
+        """Stop the tick stream and show the symbol history again."""
+        if self.streamer is not None and self.streamer.is_running():
+            self.streamer.stop()
+            self.stock_history_panel.setModel(self.stock_history_model)
+            self.statusBar().showMessage(f"Stream stopped after {self.streamer.buffer.received} ticks")
+
+    def export_trace(self):
+        """Save the recorded spans as a Chrome trace JSON file."""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Chrome Trace", "trace.json", "JSON (*.json)")
+        if file_path:
+            tracer.export_chrome_trace(file_path)
+            self.statusBar().showMessage(f"Trace written to {file_path}")
+
+    def show_timings(self, names, since=None):
+        """Show the latest duration of each span in names in the status bar."""
+        self.timing_label.setText(tracer.summary(names, since))
+
     def init_layout(self):
         """Initialize the layout."""
         central_widget = QWidget()
@@ -53,14 +365,71 @@ class DemoApp(QMainWindow):
         self.main_panel, self.button_layout = self.create_main_panel()
         horizontal_layout.addWidget(self.main_panel)
 
-        # Stocks Panel (for CSV display)
-        self.stocks_panel = QTableWidget()
-        self.stocks_panel.cellClicked.connect(self.handle_stock_symbol_click)
-        main_layout.addWidget(self.stocks_panel)
-
-        # Stock History Panel (for detail history)
-        self.stock_history_panel = QTableWidget()
-        main_layout.addWidget(self.stock_history_panel)
+        # Stocks and Stock History Panels, built on first use
+        self.main_layout = main_layout
+        self.stocks_panel = None
+        self.stock_history_panel = None
+
+    def ensure_stock_panels(self):
+        """Create the Stocks and Stock History Panels the first time they are needed."""
+        if self.stocks_panel is not None:
+            return
+
+        # Symbol prefix filter for the Stocks Panel
+        self.symbol_filter = QLineEdit()
+        self.symbol_filter.setPlaceholderText("Filter by symbol prefix...")
+        self.symbol_filter.textChanged.connect(lambda text: self.stocks_model.set_filter(0, text))
+        self.main_layout.addWidget(self.symbol_filter)
+
+        # Stocks Panel (for CSV display), sortable by clicking a column header
+        self.stocks_model = DataFrameTableModel()
+        self.stocks_panel = QTableView()
+        self.stocks_panel.setModel(self.stocks_model)
+        self.stocks_panel.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.stocks_panel.setSortingEnabled(True)
+        self.stocks_panel.clicked.connect(self.handle_stock_symbol_click)
+        self.main_layout.addWidget(self.stocks_panel)
+
+        # Stock History Panel (for detail history), with a chart of the full history beside it
+        history_layout = QHBoxLayout()
+        self.stock_history_model = DataFrameTableModel()
+        self.stock_history_panel = QTableView()
+        self.stock_history_panel.setModel(self.stock_history_model)
+        history_layout.addWidget(self.stock_history_panel, 1)
+        self.price_chart = PriceChart()
+        history_layout.addWidget(self.price_chart, 1)
+
+        # Switch pyramid levels once zooming or panning pauses
+        self.chart_timer = QTimer(self)
+        self.chart_timer.setSingleShot(True)
+        self.chart_timer.setInterval(150)
+        self.chart_timer.timeout.connect(self.refine_chart)
+        self.price_chart.view_changed.connect(lambda lo, hi: self.chart_timer.start())
+        self.main_layout.addLayout(history_layout)
+
+    def ensure_data_sources(self):
+        """Import the pandas-backed readers the first time data is requested."""
+        if self.read_csv is not None:
+            return
+
+        from constituents import constituent_reader
+        from csv_store import shared_store
+        read_history = simple_reader(shared_store.load_tail, 100)
+        self.read_csv = cached_reader(store_reader(shared_store))
+        # Constituent tables are cached with compact dtypes, so many fit in the budget
+        self.read_index = cached_reader(constituent_reader(store_reader(shared_store)), variant="constituents")
+        self.read_history = cached_reader(read_history, variant="tail100")
+
+        # Warm the cache for symbols near the current row of the Stocks Panel; only
+        # a click queues the conversion of a stale copy
+        prefetch_history = simple_reader(shared_store.load_tail, 100, convert=False)
+        self.prefetcher = HistoryPrefetcher(
+            self.stocks_panel, prefetch_history, self.history_path, variant="tail100", parent=self
+        )
+
+    def history_path(self, symbol):
+        """Return the history CSV path for symbol."""
+        return f"data/history/{symbol}.csv"
 
     def create_side_panel(self):
         """Create the side panel."""
@@ -71,6 +440,18 @@ class DemoApp(QMainWindow):
 
         side_layout.addWidget(QLabel("Side Panel"))
 
+        # Type-ahead search over symbols and company names of every index
+        self.symbol_search = QLineEdit()
+        self.symbol_search.setPlaceholderText("Search symbol or company...")
+        self.search_model = QStringListModel(self)
+        self.search_completer = QCompleter(self.search_model, self)
+        self.search_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.search_completer.setWidget(self.symbol_search)
+        self.search_completer.activated.connect(self.open_search_result)
+        self.symbol_search.textEdited.connect(self.update_search_completions)
+        self.symbol_search.returnPressed.connect(lambda: self.open_search_result(self.symbol_search.text()))
+        side_layout.addWidget(self.symbol_search)
+
         side_list = QListWidget()
         side_list.addItems(self.data.keys())
         side_list.itemClicked.connect(self.display_items_in_main_panel)
@@ -104,6 +485,45 @@ class DemoApp(QMainWindow):
 
         return main_panel, button_layout
 
+    def load_symbol_index(self):
+        """Build the symbol search index from the index CSV files in the background."""
+        csv_files = dict(self.csv_files)
+
+        def read_index(file_path, report_progress, is_cancelled):
+            # Reads from the column store, so a warm start parses no CSV
+            from csv_store import shared_store
+            return SymbolIndex.from_files(csv_files, shared_store.load)
+
+        self.loader.load("search", "data/summary", read_index)
+
+    def update_search_completions(self, text):
+        """Offer the symbols and companies matching the typed prefix."""
+        if self.symbol_index is None:
+            # Built on first use, so startup stays free of pandas and background loads
+            if not self.loader.is_loading("search"):
+                self.load_symbol_index()
+            return
+        with tracer.span("search.complete"):
+            matches = self.symbol_index.complete(text)
+        self.search_results = {f"{symbol}  {name}".rstrip(): symbol for symbol, name in matches}
+        self.search_model.setStringList(list(self.search_results))
+        if matches:
+            self.search_completer.complete()
+        else:
+            self.search_completer.popup().hide()
+
+    def open_search_result(self, text):
+        """Show the history of the chosen completion (or the best match for text)."""
+        symbol = self.search_results.get(text)
+        if symbol is None and self.symbol_index is not None:
+            matches = self.symbol_index.complete(text, limit=1)
+            symbol = matches[0][0] if matches else None
+        if not symbol:
+            return
+        self.search_completer.popup().hide()
+        self.symbol_search.setText(symbol)
+        self.display_stock_history(symbol)
+
     def display_items_in_main_panel(self, item):
         """Display the objects or overview related to the clicked side panel item."""
         category = item.text()
@@ -114,66 +534,305 @@ class DemoApp(QMainWindow):
             self.main_panel_label.setText(f"Main Panel: {category}")
             self.main_panel_text.setText("\n".join(self.data.get(category, [])))
 
-    def display_stock_history(self, symbol):
-        """Read and print stock history for the selected symbol."""
-        file_path = f"data/history/{symbol}.csv"
-
-        try:
-            # Load the CSV file
-            df = pd.read_csv(file_path)
-
-            if df.empty:
-                print(f"[INFO] No data found in {file_path}.")
-                return
-
-            # Display the last 100 rows in the console
-            print(f"\n[INFO] Stock History for {symbol} (Last 100 rows):")
-            print(df.tail(100))
-
-        except FileNotFoundError:
-            print(f"[ERROR] File not found: {file_path}")
-        except Exception as e:
-            print(f"[ERROR] An error occurred: {e}")
-
-    def handle_stock_symbol_click(self, row, column):
+    def display_csv_in_stocks_panel(self, index_name):
+        """Load the corresponding CSV file in the background for the Stocks Panel."""
+        file_path = self.csv_files.get(index_name)
+        if not file_path:
+            return
+
+        from ohlcv_panel import OhlcvPanel
+        self.ensure_stock_panels()
+        self.ensure_data_sources()
+        self.index_name = index_name
+        self.loader.cancel("screener")
+        self.panel = OhlcvPanel.open(self.panel_names[index_name])
+        # A consolidated panel already answers clicks without touching the disk
+        self.prefetcher.set_enabled(self.panel is None)
+        self.request_started["index"] = tracer.start()
+        self.loader.load("index", file_path, self.read_index)
+
+    def handle_stock_symbol_click(self, index):
         """Handle clicking on a symbol in the Stocks Panel."""
-        if column == 0:  # Assuming 'Symbol' is in the first column
-            symbol = self.stocks_panel.item(row, column).text()
-            self.display_stock_history(symbol)
+        if index.column() == 0:  # Assuming 'Symbol' is in the first column
+            with tracer.span("click.symbol"):
+                symbol = self.stocks_model.data(index)
+                self.display_stock_history(symbol)
 
     def display_stock_history(self, symbol):
-        """Read and display stock history for the selected symbol."""
-        file_path = f"data/history/{symbol}.csv"
-
+        """Load stock history for the selected symbol in the background."""
+        self.ensure_stock_panels()
+        self.ensure_data_sources()
+        self.stream_action.setChecked(False)
+        self.loader.cancel("compare")
+        self.history_symbol = symbol
+        if symbol in self.recent_symbols:
+            self.recent_symbols.remove(symbol)
+        self.recent_symbols.append(symbol)
+        if self.history_variant() != "tail100":
+            # Push the window and columns into the read instead of loading the tail
+            self.loader.cancel("history")
+            self.request_started["history"] = tracer.start()
+            self.loader.load("history", self.history_path(symbol), self.history_query_reader())
+            self.load_chart(symbol)
+            return
+        if self.panel is not None and symbol in self.panel:
+            # Slice the memory-mapped panel instead of opening the history file
+            self.loader.cancel("history")
+            started = tracer.start()
+            df = self.panel.symbol_tail(symbol, 100)
+            # The panel is a snapshot: its identity is the data version
+            self.show_history_frame(df, ("panel", id(self.panel)))
+            self.show_timings(["panel.slice", "indicators.compute", "table.populate"], since=started)
+            self.watch_only(self.history_path(symbol), "data/history/")
+            self.load_chart(symbol)
+            return
+
+        file_path = self.history_path(symbol)
+        self.request_started["history"] = tracer.start()
+        self.loader.load("history", file_path, self.read_history)
+        self.load_chart(symbol)
+
+    def history_variant(self):
+        """Return the cache variant for the history window and columns being read."""
+        if self.history_period is None and self.history_columns is None:
+            return "tail100"
+        return "query", self.history_period, self.history_columns
+
+    def history_query_reader(self):
+        """Return a loader read function for the current history window and columns."""
+        from history_query import query_history
+        max_rows = 100 if self.history_period is None else None
+        read = simple_reader(query_history, self.history_columns, period=self.history_period, max_rows=max_rows)
+        return cached_reader(read, variant=self.history_variant())
+
+    def load_chart(self, symbol):
+        """Open the OHLC pyramid of symbol in the background for the chart."""
+        self.pyramid = None
+        self.loader.load("chart", self.history_path(symbol), self.read_pyramid)
+
+    def read_pyramid(self, file_path, report_progress, is_cancelled):
+        """Open (building it if stale) the OHLC pyramid of a history file; runs on the loader."""
+        from ohlc_pyramid import OhlcPyramid
+        symbol = os.path.splitext(os.path.basename(file_path))[0]
+        return OhlcPyramid.open(symbol, history_dir=os.path.dirname(file_path))
+
+    def show_chart_level(self, level, start=None, end=None):
+        """Plot the close series of one pyramid level, showing start to end if given."""
+        field = "Close" if "Close" in self.pyramid.fields else self.pyramid.fields[0]
+        dates, values = self.pyramid.series(level, field)
+        view = None
+        if start is not None:
+            rows = self.pyramid.date_range(level, start, end)
+            view = (int(rows.start), int(rows.stop))
+        self.chart_level = level
+        self.chart_dates = dates
+        self.price_chart.set_series(values, dates, title=f"{self.pyramid.symbol} {field} ({level})", view=view)
+
+    def refine_chart(self):
+        """Move the chart to the pyramid level that fits the visible range in the row budget."""
+        if self.pyramid is None or not len(self.chart_dates):
+            return
+        lo, hi = self.price_chart.view_range()
+        start = self.chart_dates[lo]
+        end = self.chart_dates[hi] if hi < len(self.chart_dates) else None
+        level = self.pyramid.choose_level(start, end, self.chart_row_budget)
+        if level != self.chart_level:
+            self.show_chart_level(level, start, end)
+
+    def handle_data_loaded(self, channel, file_path, result):
+        """Display the result of a background load: a DataFrame, or the object its channel builds."""
+        if channel == "search":
+            # The finished symbol search index
+            self.symbol_index = result
+            if self.symbol_search.text():
+                self.update_search_completions(self.symbol_search.text())
+            return
+
+        if channel == "chart":
+            # The OHLC pyramid of the history file
+            self.pyramid = result
+            self.show_chart_level(self.pyramid.choose_level(max_rows=self.chart_row_budget))
+            return
+
+        if channel == "compare":
+            # The aligned Comparison of the selected symbols
+            self.show_comparison(result)
+            self.finish_request(channel, file_path)
+            return
+
+        # The other channels deliver DataFrames
+        df = result
+        if channel == "index":
+            # Display in the QTableView
+            with tracer.span("table.populate", rows=len(df)):
+                self.stocks_model.set_dataframe(df)
+            self.index_frame = df
+            self.finish_request(channel, file_path)
+            self.show_memory_usage(df)
+            self.watch_only(file_path, "data/summary/")
+            if self.screener_action.isChecked():
+                self.run_screener()
+            return
+
+        if channel == "screener":
+            # Left join keeps every constituent, with NaN metrics where history is missing
+            with tracer.span("table.populate", rows=len(df)):
+                self.stocks_model.set_dataframe(self.index_frame.merge(df.drop_duplicates("Symbol"),
+                                                                       on="Symbol", how="left"))
+            self.finish_request(channel, file_path)
+            return
+
+        if df.empty:
+            self.main_panel_text.setText(f"No data found in {file_path}.")
+            self.stock_history_model.clear()
+            return
+
+        if self.history_variant() == "tail100":
+            # Display the last 100 rows in the Stock History Panel
+            with tracer.span("history.slice"):
+                df = df.tail(100)
+        self.show_history_frame(df, self.file_version(file_path))
+        self.finish_request(channel, file_path)
+        # query_history leaves out a partly written last line; the tail readers keep it
+        self.watch_only(file_path, "data/history/", self.history_variant() == "tail100")
+
+    def file_version(self, file_path):
+        """Return the data version of a history file (path, mtime and size), or None."""
         try:
-            # Load the last 100 rows of the stock history
-            df = pd.read_csv(file_path)
-
-            if df.empty:
-                self.main_panel_text.setText(f"No data found in {file_path}.")
-                self.stock_history_panel.clearContents()
+            return file_key(file_path, self.history_variant())
+        except OSError:
+            return None
+
+    def show_history_frame(self, df=None, version=None):
+        """Show a history DataFrame (by default the current one), with indicators if enabled."""
+        if df is None:
+            df, version = self.history_frame, self.history_version
+            if df is None:
                 return
-
-            df = df.tail(100)
-
-            # Clear the Stock History Panel before updating
-            self.stock_history_panel.clearContents()
-            self.stock_history_panel.setRowCount(len(df))
-            self.stock_history_panel.setColumnCount(len(df.columns))
-            self.stock_history_panel.setHorizontalHeaderLabels(df.columns)
-
-            for row_idx, row in df.iterrows():
-                for col_idx, value in enumerate(row):
-                    # Convert the value to a string to avoid empty cells
-                    item = QTableWidgetItem(str(value))
-                    self.stock_history_panel.setItem(row_idx, col_idx, item)
-
-        except FileNotFoundError:
+        self.history_frame = df
+        self.history_version = version
+        if self.indicator_action.isChecked():
+            df = df.join(self.indicators().compute(self.history_symbol, df, self.history_indicators(df), version))
+        with tracer.span("table.populate", rows=len(df)):
+            self.stock_history_model.set_dataframe(df)
+
+    def indicators(self):
+        """Return the indicator engine, importing it on first use."""
+        if self.indicator_engine is None:
+            from indicators import IndicatorEngine
+            self.indicator_engine = IndicatorEngine()
+        return self.indicator_engine
+
+    def history_indicators(self, df):
+        """Return the default indicators whose input columns df has."""
+        from indicators import DEFAULT_INDICATORS
+        return [indicator for indicator in DEFAULT_INDICATORS if set(indicator.inputs) <= set(df.columns)]
+
+    def watch_only(self, file_path, folder, partial_loaded=True):
+        """Watch file_path for changes from its just-loaded end, instead of any other watched file in folder.
+
+        partial_loaded tells whether the load included an unterminated last line.
+        """
+        for watched in self.watcher.watched():
+            if watched.startswith(folder) and watched != file_path:
+                self.watcher.unwatch(watched)
+        self.watcher.watch(file_path, partial_loaded)
+
+    def handle_rows_appended(self, file_path, df):
+        """Add rows appended to a shown file to its table."""
+        import numpy as np
+        import pandas as pd
+
+        with tracer.span("table.append", rows=len(df)):
+            if file_path == self.csv_files.get(self.index_name):
+                from constituents import optimize_dtypes
+                # Give the new rows the table's types (dates parsed, categories) before appending
+                df = optimize_dtypes(df)
+                self.index_frame = optimize_dtypes(pd.concat([self.index_frame, df], ignore_index=True))
+                self.stocks_model.append_dataframe(df)
+                if self.screener_action.isChecked():
+                    # Only the new constituents miss the screener cache
+                    self.run_screener()
+            elif self.history_symbol and file_path == self.history_path(self.history_symbol):
+                self.append_history_rows(file_path, df)
+                if self.chart_level == "raw" and "Close" in df.columns and "Date" in df.columns:
+                    # Coarser levels are rebuilt from the file when the symbol is next opened
+                    dates = pd.to_datetime(df["Date"]).to_numpy().astype("datetime64[s]")
+                    self.chart_dates = np.concatenate([self.chart_dates, dates])
+                    self.price_chart.append_values(df["Close"].to_numpy(), dates)
+        self.statusBar().showMessage(f"Appended {len(df)} rows from {file_path}")
+
+    def append_history_rows(self, file_path, df):
+        """Append new bars to the history table, extending the indicators by those rows only."""
+        import pandas as pd
+
+        if self.history_frame is None:
+            return
+        # Keep to the columns being shown
+        df = df[[name for name in self.history_frame.columns if name in df.columns]]
+        self.history_frame = pd.concat([self.history_frame, df], ignore_index=True)
+        self.history_version = self.file_version(file_path)
+        if self.indicator_action.isChecked():
+            added = self.indicators().append(self.history_symbol, self.history_frame, len(df),
+                                             self.history_indicators(self.history_frame), self.history_version)
+            df = df.set_axis(added.index).join(added)
+        self.stock_history_model.append_dataframe(df)
+
+    def handle_file_rewritten(self, file_path):
+        """Reload a shown file whose existing content changed."""
+        if file_path == self.csv_files.get(self.index_name):
+            self.display_csv_in_stocks_panel(self.index_name)
+            if self.symbol_index is not None:
+                self.load_symbol_index()
+        elif self.history_symbol and file_path == self.history_path(self.history_symbol):
+            self.display_stock_history(self.history_symbol)
+
+    def finish_request(self, channel, file_path):
+        """Record the end-to-end time of a load and show the stage timings."""
+        started = self.request_started.pop(channel, None)
+        if started is not None:
+            tracer.finish(f"{channel}.total", started, file=file_path)
+        self.show_timings([
+            "io.tail_scan", "history.index", "csv.parse", "store.convert", "store.read",
+            "history.slice", "constituents.optimize", "screener.compute", "compare.load", "compare.align",
+            "table.populate", f"{channel}.total",
+        ], since=started)
+
+    def show_memory_usage(self, df):
+        """Add the memory a constituents table takes, and what its dtypes saved, to the timings."""
+        before, after = df.attrs.get("memory_usage", (None, None))
+        if before:
+            self.timing_label.setText(
+                f"{self.timing_label.text()} | memory {after / 1024:.0f} KB, "
+                f"{(before - after) / 1024:.0f} KB ({(before - after) * 100 / before:.0f}%) saved by dtypes"
+            )
+
+    def closeEvent(self, event):
+        """Save the session, then stop background loading, prefetching, streaming and screening."""
+        save_session(self.session_state())
+        self.loader.shutdown()
+        self.stop_stream()
+        if self.screener is not None:
+            self.screener.shutdown()
+        if self.prefetcher is not None:
+            self.prefetcher.set_enabled(False)
+            self.prefetcher.wait_for_done()
+        super().closeEvent(event)
+
+    def handle_data_failed(self, channel, file_path, error):
+        """Report a failed background load in the Main Panel."""
+        if channel == "search":
+            # Search stays unavailable; the status bar already says why
+            return
+        if isinstance(error, FileNotFoundError):
             self.main_panel_text.setText(f"File not found: {file_path}")
-            self.stock_history_panel.clearContents()
-        except Exception as e:
-            self.main_panel_text.setText(f"Error: {e}")
-            self.stock_history_panel.clearContents()
+        else:
+            self.main_panel_text.setText(f"Error: {error}")
+        if channel == "history":
+            self.stock_history_model.clear()
+        elif channel == "chart":
+            self.pyramid = None
+            self.price_chart.clear()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
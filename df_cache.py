@@ -0,0 +1,115 @@
+import os
+import threading
+from collections import OrderedDict
+
+from instrumentation import count
+
+
+def file_key(file_path, variant=None):
+    """Return the cache key for a file: absolute path, reader variant, mtime and size."""
+    st = os.stat(file_path)
+    return os.path.abspath(file_path), variant, st.st_mtime_ns, st.st_size
+
+
+class DataFrameCache:
+    """Thread-safe LRU cache of parsed DataFrames with a memory budget.
+
+    Entries are keyed by file path plus mtime and size, so an edited file
+    misses and is parsed again. The optional variant separates different
+    reads of the same file (for example the full file and only its tail).
+    Cached frames are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (DataFrame, nbytes)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_path, key=None, variant=None):
+        """Return the cached DataFrame for file_path, or None on a miss."""
+        key = key or file_key(file_path, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                count("cache.miss")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        count("cache.hit")
+        return entry[0]
+
+    def contains(self, file_path, key=None, variant=None):
+        """Return True if file_path is cached, without touching counters or LRU order."""
+        key = key or file_key(file_path, variant)
+        with self._lock:
+            return key in self._entries
+
+    def put(self, file_path, df, key=None, variant=None):
+        """Store df for file_path, evicting least recently used entries."""
+        key = key or file_key(file_path, variant)
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            # Drop stale versions of the same file first
+            for old_key in [k for k in self._entries if k[:2] == key[:2]]:
+                self._remove(old_key)
+            self._entries[key] = (df, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+                count("cache.eviction")
+
+    def get_or_load(self, file_path, load_func, variant=None):
+        """Return the cached DataFrame for file_path, calling load_func on a miss."""
+        key = file_key(file_path, variant)
+        df = self.get(file_path, key)
+        if df is None:
+            df = load_func(file_path)
+            self.put(file_path, df, key)
+        return df
+
+    def clear(self):
+        """Remove every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return the cache counters as a dict."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key):
+        _, nbytes = self._entries.pop(key)
+        self.current_bytes -= nbytes
+
+
+# Cache shared by every window in the process
+shared_cache = DataFrameCache()
+
+
+def cached_reader(read_func, cache=shared_cache, variant=None):
+    """Wrap a CsvLoader read function so its results go through cache."""
+    def read(file_path, report_progress, is_cancelled):
+        key = file_key(file_path, variant)
+        df = cache.get(file_path, key)
+        if df is None:
+            df = read_func(file_path, report_progress, is_cancelled)
+            cache.put(file_path, df, key)
+        return df
+    return read
@@ -0,0 +1,46 @@
+import json
+import os
+
+# Bytes before the last seen offset kept to tell an append from a rewrite
+FINGERPRINT_BYTES = 256
+
+
+def read_fingerprint(f, offset, size=FINGERPRINT_BYTES):
+    """Return the (up to) size bytes of the open binary file f just before offset."""
+    start = max(offset - size, 0)
+    f.seek(start)
+    return f.read(offset - start)
+
+
+def is_appended(f, offset, fingerprint):
+    """Return True if f only grew past offset: it is no shorter and still ends in fingerprint there."""
+    return os.fstat(f.fileno()).st_size >= offset and read_fingerprint(f, offset, len(fingerprint)) == fingerprint
+
+
+def replace_file(path, write):
+    """Write path atomically: write(tmp_path) fills a temporary file that then replaces path.
+
+    Readers that still have the old file open or memory-mapped keep working.
+    """
+    tmp_path = path + ".tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_array(path, array):
+    """Atomically save array to path in .npy format."""
+    # Deferred import: the file watcher uses this module at application startup
+    import numpy as np
+
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+    replace_file(path, write)
+
+
+def save_json(path, obj):
+    """Atomically write obj to path as JSON."""
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(obj, f)
+    replace_file(path, write)
@@ -0,0 +1,158 @@
+import io
+import os
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from file_helpers import FINGERPRINT_BYTES, is_appended, read_fingerprint
+from instrumentation import count, span
+
+
+class _WatchedFile:
+    """Read position and identity of one watched CSV file."""
+
+    def __init__(self, header, offset, fingerprint, partial=False, partial_loaded=True):
+        self.header = header
+        self.offset = offset
+        self.fingerprint = fingerprint
+        # True while offset is inside an unterminated last line
+        self.partial = partial
+        # Whether the owner's load includes an unterminated last line
+        self.partial_loaded = partial_loaded
+
+
+class CsvTailWatcher(QObject):
+    """Watch CSV files and parse only the rows appended to them.
+
+    Each watched file remembers the offset just after its last complete
+    record. When the file changes, the watcher waits delay_ms for the writes
+    to settle, then reads from that offset to the end, parses the new complete
+    lines (with the header in front) and emits appended. An unterminated last
+    line present when watching starts counts as already read if the owner's
+    load includes it (read_csv does, query_history does not); it is then
+    skipped once its line break arrives. If the bytes before the offset
+    changed, or the file shrank, the file was rewritten rather than appended
+    to and rewritten is emitted instead; reloading is up to the receiver.
+    """
+
+    appended = pyqtSignal(str, object)  # file_path, DataFrame of the new rows
+    rewritten = pyqtSignal(str)         # file_path
+
+    def __init__(self, delay_ms=250, parent=None):
+        super().__init__(parent)
+        self._files = {}
+        self._pending = set()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_changed)
+
+        # Debounce: a burst of writes causes a single refresh
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.refresh)
+
+    def watch(self, file_path, partial_loaded=True):
+        """Start watching file_path from its current end.
+
+        partial_loaded tells whether the loaded data includes an unterminated last line.
+        """
+        try:
+            self._files[file_path] = self._snapshot(file_path, partial_loaded)
+        except OSError:
+            return False
+        if file_path not in self._watcher.files():
+            self._watcher.addPath(file_path)
+        return True
+
+    def unwatch(self, file_path):
+        """Stop watching file_path."""
+        self._files.pop(file_path, None)
+        self._pending.discard(file_path)
+        if file_path in self._watcher.files():
+            self._watcher.removePath(file_path)
+
+    def watched(self):
+        """Return the paths being watched."""
+        return list(self._files)
+
+    def refresh(self):
+        """Check every file that changed since the last refresh."""
+        pending, self._pending = self._pending, set()
+        for file_path in pending:
+            if file_path in self._files:
+                self._check(file_path)
+
+    def _on_changed(self, file_path):
+        self._pending.add(file_path)
+        self._timer.start()
+
+    def _check(self, file_path):
+        state = self._files[file_path]
+        # Files replaced by rename drop out of the watcher; watch the new one
+        if os.path.exists(file_path) and file_path not in self._watcher.files():
+            self._watcher.addPath(file_path)
+
+        try:
+            with open(file_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if not is_appended(f, state.offset, state.fingerprint):
+                    self._files[file_path] = self._snapshot(file_path, state.partial_loaded)
+                    count("watch.rewritten")
+                    self.rewritten.emit(file_path)
+                    return
+                data = f.read(size - state.offset)
+        except OSError:
+            return
+
+        # Skip the rest of a last line the loaded table already holds
+        skip = data.find(b"\n") + 1 if state.partial else 0
+        # Leave a partly written last line for the next change
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return
+        data = data[:end]
+
+        import pandas as pd
+
+        try:
+            with span("watch.parse", file=file_path):
+                df = pd.read_csv(io.BytesIO(state.header + data[skip:]))
+        except ValueError:
+            # Rows that do not fit the header (ParserError is a ValueError): let the
+            # owner reload the whole file, which reports the problem through its loader
+            self._files[file_path] = self._snapshot(file_path, state.partial_loaded)
+            count("watch.rewritten")
+            self.rewritten.emit(file_path)
+            return
+        state.offset += end
+        state.partial = False
+        state.fingerprint = (state.fingerprint + data)[-FINGERPRINT_BYTES:]
+        count("watch.appended_rows", len(df))
+        if not df.empty:
+            self.appended.emit(file_path, df)
+
+    def _snapshot(self, file_path, partial_loaded=True):
+        with open(file_path, "rb") as f:
+            header = f.readline()
+            header_end = f.tell()
+            size = os.fstat(f.fileno()).st_size
+
+            # The offset goes just after the last complete line, or after an
+            # unterminated last line the owner has loaded already
+            offset = max(size, header_end)
+            partial = size > header_end and read_fingerprint(f, size, 1) != b"\n"
+            if partial and not partial_loaded:
+                offset = header_end
+                pos = size
+                while pos > header_end:
+                    start = max(pos - 4096, header_end)
+                    f.seek(start)
+                    newline = f.read(pos - start).rfind(b"\n")
+                    if newline != -1:
+                        offset = start + newline + 1
+                        break
+                    pos = start
+
+            fingerprint = read_fingerprint(f, offset)
+        if not header.endswith(b"\n"):
+            header += b"\n"
+        return _WatchedFile(header, offset, fingerprint, partial and partial_loaded, partial_loaded)
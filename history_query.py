@@ -0,0 +1,312 @@
+import csv
+import io
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from file_helpers import FINGERPRINT_BYTES, is_appended, replace_file
+from instrumentation import count, span
+
+# Declared parse types of the history columns; Date stays a string like in every other reader
+HISTORY_DTYPES = {
+    "Date": object,
+    "Open": np.float64,
+    "High": np.float64,
+    "Low": np.float64,
+    "Close": np.float64,
+    "Adj Close": np.float64,
+    "Volume": np.int64,
+}
+
+INDEX_VERSION = 2
+# Rows between two samples of the date index
+INDEX_STEP = 256
+
+
+def index_path(file_path):
+    """Return the path of the date index stored next to a history CSV."""
+    return file_path + ".idx"
+
+
+def _parse_date(line, column):
+    """Return the date in field column of one CSV record (bytes), or NaT."""
+    fields = next(csv.reader([line.decode("utf-8", "replace")]), [])
+    try:
+        return pd.Timestamp(fields[column]).to_datetime64().astype("datetime64[ns]")
+    except (IndexError, ValueError):
+        return np.datetime64("NaT", "ns")
+
+
+class DateIndex:
+    """Sparse date -> byte offset index of a history CSV, kept in a sidecar file.
+
+    Every INDEX_STEP-th record is sampled with its byte offset and date,
+    so finding a date window is a binary search over rows / step entries
+    followed by one seek; the window is at most one step wider on each
+    side. Only newline-terminated records are indexed. When the CSV grows
+    and the bytes before the indexed end are unchanged (the check
+    CsvTailWatcher makes), only the appended bytes are scanned (refresh);
+    any other change rebuilds the index. Rows must be in ascending date
+    order.
+    """
+
+    def __init__(self, file_path, meta, offsets, dates):
+        self.file_path = file_path
+        self.meta = meta
+        self.offsets = offsets
+        self.dates = dates
+        self._lock = threading.Lock()
+
+    @property
+    def header(self):
+        return self.meta["header"]
+
+    @property
+    def rows(self):
+        return self.meta["rows"]
+
+    @property
+    def step(self):
+        return self.meta["step"]
+
+    def last_date(self):
+        """Return the date of the last indexed row, or None."""
+        last = self.meta["last_date"]
+        return pd.Timestamp(last) if last else None
+
+    @classmethod
+    def open(cls, file_path, step=INDEX_STEP):
+        """Return the up-to-date index of file_path, loading, extending or building its sidecar."""
+        index = cls.load(file_path)
+        if index is None or index.step != step:
+            index = cls.build(file_path, step)
+        else:
+            index.refresh()
+        return index
+
+    @classmethod
+    def load(cls, file_path):
+        """Return the index saved next to file_path as is, or None if there is no usable one."""
+        try:
+            with open(index_path(file_path), "rb") as f, np.load(f) as arrays:
+                meta = json.loads(str(arrays["meta"]))
+                offsets, dates = arrays["offsets"], arrays["dates"]
+        except (OSError, ValueError, KeyError):
+            return None
+        if meta.get("version") != INDEX_VERSION:
+            return None
+        return cls(file_path, meta, offsets, dates)
+
+    @classmethod
+    def build(cls, file_path, step=INDEX_STEP):
+        """Scan the whole of file_path, save its index and return it."""
+        with span("history.index", file=file_path):
+            with open(file_path, "rb") as f:
+                data = f.read()
+            header_end = data.find(b"\n") + 1
+            header = next(csv.reader([data[:header_end].decode("utf-8-sig", "replace")]), [])
+            meta = {
+                "version": INDEX_VERSION,
+                "step": step,
+                "header": header,
+                "rows": 0,
+                "end": header_end if header_end else len(data),
+                "last_date": None,
+                "fingerprint": data[:header_end][-FINGERPRINT_BYTES:].hex(),
+            }
+            index = cls(file_path, meta, np.empty(0, dtype=np.int64), np.empty(0, dtype="datetime64[ns]"))
+            if header_end:
+                index._extend(data[header_end:], header_end)
+        count("history.index.build")
+        index.save()
+        return index
+
+    def refresh(self):
+        """Bring the index up to date with its file: nothing, an extension or a rebuild."""
+        with self._lock:
+            st = os.stat(self.file_path)
+            end = self.meta["end"]
+            size = self.meta.get("size", end)
+            if st.st_size == size and st.st_mtime_ns == self.meta.get("mtime_ns"):
+                count("history.index.hit")
+                return
+            # A change that did not grow the file cannot be an append
+            with open(self.file_path, "rb") as f:
+                grown = st.st_size > size and is_appended(f, end, bytes.fromhex(self.meta["fingerprint"]))
+                appended = f.read() if grown else b""
+            if not grown:
+                rebuilt = self.build(self.file_path, self.step)
+                self.meta, self.offsets, self.dates = rebuilt.meta, rebuilt.offsets, rebuilt.dates
+                return
+            with span("history.index", file=self.file_path, appended=len(appended)):
+                self._extend(appended, end)
+            count("history.index.extend")
+            self.save()
+
+    def _extend(self, data, base):
+        """Index the complete records in data, which starts at byte base of the file."""
+        data = data[:data.rfind(b"\n") + 1]
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        starts = np.concatenate([[0], np.flatnonzero(buffer == ord("\n"))[:-1] + 1]) if len(data) else \
+            np.empty(0, dtype=np.int64)
+        ends = np.append(starts[1:], len(data))
+        # Skip blank lines, as read_csv does
+        length = ends - starts - 1
+        length[length == 1] -= buffer[starts[length == 1]] == ord("\r")
+        records = starts[length > 0]
+
+        first = self.meta["rows"]
+        sampled = records[(-first % self.step)::self.step]
+        column = self.header.index("Date") if "Date" in self.header else None
+        if column is not None and len(sampled):
+            dates = np.array([_parse_date(data[lo:data.find(b"\n", lo)], column) for lo in sampled],
+                             dtype="datetime64[ns]")
+        else:
+            dates = np.full(len(sampled), np.datetime64("NaT", "ns"))
+        self.offsets = np.concatenate([self.offsets, sampled + base]).astype(np.int64)
+        self.dates = np.concatenate([self.dates, dates])
+
+        self.meta["rows"] = first + len(records)
+        self.meta["end"] = base + len(data)
+        self.meta["fingerprint"] = (bytes.fromhex(self.meta["fingerprint"]) + data)[-FINGERPRINT_BYTES:].hex()
+        if column is not None and len(records):
+            last = _parse_date(data[records[-1]:len(data) - 1], column)
+            if not np.isnat(last):
+                self.meta["last_date"] = str(pd.Timestamp(last))
+        try:
+            st = os.stat(self.file_path)
+            self.meta["size"], self.meta["mtime_ns"] = st.st_size, st.st_mtime_ns
+        except OSError:
+            pass
+
+    def save(self):
+        """Write the index next to its file; failures are ignored (it is rebuilt when missing)."""
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                np.savez(f, meta=np.array(json.dumps(self.meta)), offsets=self.offsets, dates=self.dates)
+
+        try:
+            replace_file(index_path(self.file_path), write)
+        except OSError:
+            pass
+
+    def locate(self, start=None, end=None, max_rows=None):
+        """Return the (first, stop) byte range holding every row dated start to end.
+
+        The range ends at most at the last indexed record, so a partly written
+        last line is left out. With max_rows the range holds at least the last
+        max_rows rows of that window.
+        """
+        has_dates = len(self.dates) and not np.isnat(self.dates).any()
+        lo, hi = 0, len(self.offsets)
+        if has_dates and start is not None:
+            # The last sample before start; earlier rows are all before it
+            lo = max(int(np.searchsorted(self.dates, pd.Timestamp(start).to_datetime64(), "left")) - 1, 0)
+        if has_dates and end is not None:
+            # The first sample after end; it and every later row are after it
+            hi = int(np.searchsorted(self.dates, pd.Timestamp(end).to_datetime64(), "right"))
+        if max_rows is not None:
+            # The window ends at the last row, or at least at the sample before hi
+            last_row = (hi - 1) * self.step if has_dates and end is not None else self.rows - 1
+            lo = max(lo, max(last_row - max_rows + 1, 0) // self.step)
+        hi = max(hi, lo)
+        if not len(self.offsets):
+            return self.meta["end"], self.meta["end"]
+        first = int(self.offsets[lo]) if lo < len(self.offsets) else self.meta["end"]
+        stop = int(self.offsets[hi]) if hi < len(self.offsets) else self.meta["end"]
+        return first, stop
+
+    def read(self, first, stop):
+        """Return the bytes of the file from first to stop (None: its end)."""
+        with open(self.file_path, "rb") as f:
+            f.seek(first)
+            return f.read() if stop is None else f.read(stop - first)
+
+
+class DateIndexCache:
+    """Thread-safe LRU of open DateIndex objects, refreshed on every use."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # file path -> DateIndex
+        self._lock = threading.Lock()
+
+    def get(self, file_path):
+        """Return the up-to-date DateIndex of file_path."""
+        with self._lock:
+            index = self._entries.get(file_path)
+            if index is not None:
+                self._entries.move_to_end(file_path)
+        if index is None:
+            index = DateIndex.open(file_path)
+        else:
+            index.refresh()
+        with self._lock:
+            self._entries[file_path] = index
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+
+# Date indexes shared by every window in the process
+shared_date_indexes = DateIndexCache()
+
+
+def query_history(file_path, columns=None, start=None, end=None, period=None, max_rows=None,
+                  indexes=shared_date_indexes):
+    """Read only the wanted columns and date range of a history CSV.
+
+    columns lists the fields wanted (Date is always included; unknown names
+    are ignored). The rows are those dated from start to end inclusive, or,
+    with period (a Timedelta string such as "92D"), those within period of
+    the last bar; max_rows keeps only the last rows of the range. The file's
+    DateIndex turns the range into a byte range, and only those bytes are
+    handed to read_csv, with usecols and the HISTORY_DTYPES, before the
+    rows outside the range are dropped. Records must be one per line (no
+    quoted line breaks).
+    """
+    index = indexes.get(file_path)
+    header = index.header
+    usecols = header if columns is None else \
+        [name for name in header if name == "Date" or name in columns]
+    dtype = {name: HISTORY_DTYPES[name] for name in usecols if name in HISTORY_DTYPES}
+
+    if start is None and period is not None and index.last_date() is not None:
+        start = index.last_date() - pd.Timedelta(period)
+    first, stop = index.locate(start, end, max_rows)
+    data = index.read(first, stop)
+    if not data.strip():
+        return pd.DataFrame({name: pd.Series(dtype=dtype.get(name, object)) for name in usecols})
+
+    with span("csv.parse", file=file_path, bytes=len(data)):
+        read = dict(header=None, names=header, usecols=usecols)
+        try:
+            df = pd.read_csv(io.BytesIO(data), dtype=dtype, **read)
+        except ValueError:
+            # Missing volumes cannot be int64: read them as floats instead
+            dtype = {name: np.float64 if kind is np.int64 else kind for name, kind in dtype.items()}
+            df = pd.read_csv(io.BytesIO(data), dtype=dtype, **read)
+
+    if "Date" in df.columns and (start is not None or end is not None):
+        # The byte range is sample-aligned; trim it to the window
+        dates = pd.to_datetime(df["Date"], format="ISO8601")
+        keep = np.ones(len(df), dtype=bool)
+        if start is not None:
+            keep &= (dates >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            keep &= (dates <= pd.Timestamp(end)).to_numpy()
+        df = df[keep]
+    if max_rows is not None:
+        df = df.tail(max_rows)
+    return df.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    for file_path in sys.argv[1:]:
+        index = DateIndex.build(file_path)
+        print(f"[INFO] Indexed {index.rows} rows of {file_path} in {len(index.offsets)} samples.")
@@ -0,0 +1,252 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import count, span
+
+
+def _ewm(values, alpha, seed=None):
+    """Exponentially weighted mean (recursive form), continuing from seed if given."""
+    values = np.asarray(values, dtype=float)
+    if seed is None or np.isnan(seed):
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    # Prepending the previous mean makes the recursion pick up where it stopped
+    return pd.Series(np.concatenate([[seed], values])).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _last(values):
+    return float(values[-1]) if len(values) else None
+
+
+class Indicator:
+    """A vectorized indicator kernel plus the state needed to extend it.
+
+    compute(df) returns the output columns for every row of df and a state;
+    extend(state, df) returns the outputs for rows appended after those the
+    state came from, without touching the earlier rows.
+    """
+
+    name = ""
+    inputs = ("Close",)
+
+    def __init__(self, **params):
+        self.params = params
+
+    def key(self):
+        """Return a hashable (name, params) identity."""
+        return self.name, tuple(sorted(self.params.items()))
+
+    def columns(self):
+        """Return the names of the output columns."""
+        args = ",".join(str(value) for value in self.params.values())
+        return [f"{self.name}({args})"]
+
+    def compute(self, df):
+        raise NotImplementedError
+
+    def extend(self, state, df):
+        raise NotImplementedError
+
+    def _frame(self, outputs, index):
+        return pd.DataFrame(dict(zip(self.columns(), outputs)), index=index)
+
+
+class RollingIndicator(Indicator):
+    """Indicator over a fixed window; its state is the last window - 1 input rows."""
+
+    def window(self):
+        return self.params["window"]
+
+    def kernel(self, df):
+        raise NotImplementedError
+
+    def compute(self, df):
+        return self._frame(self.kernel(df), df.index), df[list(self.inputs)].tail(self.window() - 1)
+
+    def extend(self, state, df):
+        joined = pd.concat([state, df[list(self.inputs)]], ignore_index=True)
+        outputs = [values[len(state):] for values in self.kernel(joined)]
+        return self._frame(outputs, df.index), joined.tail(self.window() - 1)
+
+
+class SMA(RollingIndicator):
+    """Simple moving average of Close."""
+
+    name = "SMA"
+
+    def __init__(self, window=20):
+        super().__init__(window=window)
+
+    def kernel(self, df):
+        return [df["Close"].rolling(self.window()).mean().to_numpy()]
+
+
+class Bollinger(RollingIndicator):
+    """Bollinger bands: SMA of Close plus and minus k standard deviations."""
+
+    name = "BB"
+
+    def __init__(self, window=20, k=2):
+        super().__init__(window=window, k=k)
+
+    def columns(self):
+        args = f"{self.params['window']},{self.params['k']}"
+        return [f"BB Mid({args})", f"BB Upper({args})", f"BB Lower({args})"]
+
+    def kernel(self, df):
+        rolling = df["Close"].rolling(self.window())
+        mid = rolling.mean().to_numpy()
+        width = self.params["k"] * rolling.std(ddof=0).to_numpy()
+        return [mid, mid + width, mid - width]
+
+
+class EMA(Indicator):
+    """Exponential moving average of Close; the state is the last average."""
+
+    name = "EMA"
+
+    def __init__(self, span=20):
+        super().__init__(span=span)
+
+    def _ema(self, df, seed):
+        return _ewm(df["Close"], 2 / (self.params["span"] + 1), seed)
+
+    def compute(self, df):
+        ema = self._ema(df, None)
+        return self._frame([ema], df.index), _last(ema)
+
+    def extend(self, state, df):
+        ema = self._ema(df, state)
+        return self._frame([ema], df.index), _last(ema) if len(ema) else state
+
+
+class RSI(Indicator):
+    """Relative strength index with Wilder smoothing; the state is (last close, avg gain, avg loss)."""
+
+    name = "RSI"
+
+    def __init__(self, period=14):
+        super().__init__(period=period)
+
+    def _rsi(self, df, state):
+        close = df["Close"].to_numpy(dtype=float)
+        last_close, gain_seed, loss_seed = state or (np.nan, None, None)
+        delta = np.diff(close, prepend=last_close)
+        alpha = 1 / self.params["period"]
+        gains = _ewm(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), alpha, gain_seed)
+        losses = _ewm(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), alpha, loss_seed)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+        rsi[np.isnan(gains) | np.isnan(losses)] = np.nan
+        if len(close):
+            state = (close[-1], _last(gains), _last(losses))
+        return [rsi], state
+
+    def compute(self, df):
+        outputs, state = self._rsi(df, None)
+        return self._frame(outputs, df.index), state
+
+    def extend(self, state, df):
+        outputs, state = self._rsi(df, state)
+        return self._frame(outputs, df.index), state
+
+
+class ATR(Indicator):
+    """Average true range with Wilder smoothing; the state is (last close, last ATR)."""
+
+    name = "ATR"
+    inputs = ("High", "Low", "Close")
+
+    def __init__(self, period=14):
+        super().__init__(period=period)
+
+    def _atr(self, df, state):
+        high, low, close = (df[column].to_numpy(dtype=float) for column in self.inputs)
+        last_close, seed = state or (np.nan, None)
+        previous = np.concatenate([[last_close], close[:-1]])
+        # fmax skips the NaN previous close of the very first bar
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+        atr = _ewm(true_range, 1 / self.params["period"], seed)
+        if len(close):
+            state = (close[-1], _last(atr))
+        return [atr], state
+
+    def compute(self, df):
+        outputs, state = self._atr(df, None)
+        return self._frame(outputs, df.index), state
+
+    def extend(self, state, df):
+        outputs, state = self._atr(df, state)
+        return self._frame(outputs, df.index), state
+
+
+DEFAULT_INDICATORS = (SMA(20), EMA(20), RSI(14), Bollinger(20, 2), ATR(14))
+
+
+class IndicatorEngine:
+    """Memoized indicator columns for history frames.
+
+    Results are kept per (symbol, indicator, params) together with the data
+    version (any hashable token, such as df_cache.file_key) and row count they
+    were computed for. A frame with the same version and length is answered
+    from the memo; append extends the memo by the new rows only, using each
+    indicator's saved state, instead of recomputing the whole window.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (symbol, indicator key) -> (version, rows, outputs, state)
+
+    def compute(self, symbol, df, indicators=DEFAULT_INDICATORS, version=None):
+        """Return the indicator columns for every row of df."""
+        frames = []
+        for indicator in indicators:
+            key = (symbol, indicator.key())
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and entry[1] == len(df):
+                count("indicators.hit")
+                self._entries.move_to_end(key)
+                outputs = entry[2]
+            else:
+                count("indicators.miss")
+                with span("indicators.compute", indicator=indicator.name, rows=len(df)):
+                    outputs, state = indicator.compute(df)
+                self._store(key, version, len(df), outputs, state)
+            frames.append(outputs.set_axis(df.index))
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame(index=df.index)
+
+    def append(self, symbol, df, new_rows, indicators=DEFAULT_INDICATORS, version=None):
+        """Return the indicator columns for the last new_rows rows of df, which were just appended.
+
+        Indicators memoized for the first len(df) - new_rows rows are
+        extended; any other is computed over the whole of df.
+        """
+        frames = []
+        old_rows = len(df) - new_rows
+        tail = df.iloc[old_rows:]
+        for indicator in indicators:
+            key = (symbol, indicator.key())
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == old_rows:
+                count("indicators.extend")
+                with span("indicators.extend", indicator=indicator.name, rows=new_rows):
+                    added, state = indicator.extend(entry[3], tail)
+                outputs = pd.concat([entry[2], added])
+            else:
+                count("indicators.miss")
+                with span("indicators.compute", indicator=indicator.name, rows=len(df)):
+                    outputs, state = indicator.compute(df)
+            self._store(key, version, len(df), outputs.set_axis(df.index), state)
+            frames.append(outputs.iloc[old_rows:].set_axis(tail.index))
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame(index=tail.index)
+
+    def clear(self):
+        """Forget every memoized result."""
+        self._entries.clear()
+
+    def _store(self, key, version, rows, outputs, state):
+        self._entries[key] = (version, rows, outputs, state)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def _now_us():
+    return time.perf_counter_ns() // 1000
+
+
+class Tracer:
+    """Thread-safe collector of timing spans and counters.
+
+    Spans are kept in a bounded ring so a long session does not grow without
+    limit. Everything recorded can be written out in the Chrome trace event
+    format (chrome://tracing, Perfetto) with export_chrome_trace.
+    """
+
+    def __init__(self, max_events=20_000):
+        self._events = deque(maxlen=max_events)
+        self._last = {}      # span name -> (start timestamp, duration in ms)
+        self.counters = {}   # counter name -> value
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, **args):
+        """Time the body of a with-block as a span called name."""
+        start = _now_us()
+        try:
+            yield
+        finally:
+            self._add_span(name, start, _now_us(), args)
+
+    def start(self):
+        """Return a start timestamp for a span that ends in another callback."""
+        return _now_us()
+
+    def finish(self, name, start, **args):
+        """Record a span called name that began at start (from self.start())."""
+        self._add_span(name, start, _now_us(), args)
+
+    def count(self, name, value=1):
+        """Add value to the counter called name."""
+        with self._lock:
+            total = self.counters.get(name, 0) + value
+            self.counters[name] = total
+            self._events.append({
+                "name": name, "ph": "C", "ts": _now_us(), "pid": os.getpid(),
+                "tid": threading.get_ident(), "args": {name: total},
+            })
+
+    def last(self, name):
+        """Return the duration in ms of the latest span called name, or None."""
+        entry = self._last.get(name)
+        return entry[1] if entry else None
+
+    def summary(self, names, since=None):
+        """Format the latest duration of each span in names for display.
+
+        With since (a timestamp from start()), spans that began earlier are left out.
+        """
+        parts = []
+        for name in names:
+            entry = self._last.get(name)
+            if entry and (since is None or entry[0] >= since):
+                parts.append(f"{name} {entry[1]:.1f} ms")
+        return " | ".join(parts)
+
+    def clear(self):
+        """Forget every recorded span and counter."""
+        with self._lock:
+            self._events.clear()
+            self._last.clear()
+            self.counters.clear()
+
+    def export_chrome_trace(self, file_path):
+        """Write the recorded spans and counters as a Chrome trace JSON file."""
+        with self._lock:
+            events = list(self._events)
+        with open(file_path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def _add_span(self, name, start, end, args):
+        with self._lock:
+            self._last[name] = (start, (end - start) / 1000)
+            self._events.append({
+                "name": name, "cat": name.split(".")[0], "ph": "X", "ts": start, "dur": end - start,
+                "pid": os.getpid(), "tid": threading.get_ident(), "args": args,
+            })
+
+
+# Tracer shared by every module in the process
+tracer = Tracer()
+span = tracer.span
+count = tracer.count
@@ -0,0 +1,162 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from file_helpers import save_array, save_json
+from instrumentation import span
+from ohlcv_panel import bars_frame, date_slice
+
+FORMAT_VERSION = 1
+
+# Aggregation levels, finest first: (name, resample rule, nominal bucket in seconds).
+# Every bucket is labelled with its start, so weeks start on Monday and months on the 1st.
+LEVELS = (
+    ("5min", "5min", 5 * 60),
+    ("hourly", "1h", 60 * 60),
+    ("daily", "1D", 24 * 60 * 60),
+    ("weekly", "W-MON", 7 * 24 * 60 * 60),
+    ("monthly", "MS", 31 * 24 * 60 * 60),
+)
+
+# How each OHLCV field combines within a bucket
+AGGREGATIONS = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Adj Close": "last", "Volume": "sum"}
+
+
+def build_pyramid(symbol, history_dir="data/history", out_dir="data/pyramid"):
+    """Aggregate the history of symbol into coarser OHLCV levels and save them.
+
+    The raw bars are kept as level "raw"; every level in LEVELS whose bucket
+    is longer than the typical bar spacing is built with a pandas resample
+    (so daily data gets weekly and monthly levels, minute data also 5min,
+    hourly and daily ones). Each level is stored as a float64 (rows, fields)
+    array in {out_dir}/{symbol}/{level}.values.npy with its datetime64[s]
+    bucket starts in {level}.dates.npy. Returns the meta written to meta.json.
+    """
+    file_path = os.path.join(history_dir, f"{symbol}.csv")
+    st = os.stat(file_path)
+    with span("pyramid.build", symbol=symbol):
+        df = pd.read_csv(file_path)
+        dates = pd.to_datetime(df["Date"])
+        fields = [field for field in AGGREGATIONS if field in df.columns]
+        raw = df[fields].set_axis(dates).sort_index()
+
+        levels = {"raw": raw}
+        spacing = np.median(np.diff(raw.index.to_numpy()).astype("timedelta64[s]").astype(np.int64)) \
+            if len(raw) > 1 else 0
+        for name, rule, seconds in LEVELS:
+            if seconds > spacing:
+                resampler = raw.resample(rule, label="left", closed="left")
+                bars = resampler.agg({field: AGGREGATIONS[field] for field in fields})
+                # Drop buckets without any bar (weekends, holidays, overnight)
+                levels[name] = bars[resampler.size().to_numpy() > 0]
+
+    out_dir = os.path.join(out_dir, symbol)
+    os.makedirs(out_dir, exist_ok=True)
+    for name, bars in levels.items():
+        base = os.path.join(out_dir, name)
+        save_array(base + ".values.npy", bars.to_numpy(dtype=np.float64))
+        save_array(base + ".dates.npy", bars.index.to_numpy().astype("datetime64[s]"))
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "source_mtime_ns": st.st_mtime_ns,
+        "source_size": st.st_size,
+        "fields": fields,
+        "levels": [{"name": name, "rows": len(bars)} for name, bars in levels.items()],
+    }
+    # meta.json is written last; it marks the pyramid as complete
+    save_json(os.path.join(out_dir, "meta.json"), meta)
+    return meta
+
+
+class OhlcPyramid:
+    """Read-only view of the levels written by build_pyramid for one symbol."""
+
+    def __init__(self, symbol, directory, meta):
+        self.symbol = symbol
+        self.directory = directory
+        self.fields = meta["fields"]
+        self.levels = [level["name"] for level in meta["levels"]]
+        self._rows = {level["name"]: level["rows"] for level in meta["levels"]}
+        self._arrays = {}
+
+    @classmethod
+    def open(cls, symbol, history_dir="data/history", out_dir="data/pyramid", build=True):
+        """Open the pyramid of symbol, (re)building it if it is missing or stale.
+
+        With build=False a missing or stale pyramid gives None instead.
+        """
+        directory = os.path.join(out_dir, symbol)
+        st = os.stat(os.path.join(history_dir, f"{symbol}.csv"))
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+        fresh = meta is not None and meta.get("version") == FORMAT_VERSION and \
+            meta["source_mtime_ns"] == st.st_mtime_ns and meta["source_size"] == st.st_size
+        if not fresh:
+            if not build:
+                return None
+            meta = build_pyramid(symbol, history_dir, out_dir)
+        return cls(symbol, directory, meta)
+
+    def rows(self, level):
+        """Return the number of bars in level."""
+        return self._rows[level]
+
+    def dates(self, level):
+        """Return the bucket start times of level (datetime64[s])."""
+        return self._load(level)[0]
+
+    def values(self, level):
+        """Return the (rows, fields) float64 array of level, memory-mapped."""
+        return self._load(level)[1]
+
+    def date_range(self, level, start=None, end=None):
+        """Return the slice of level's rows between start and end inclusive."""
+        return date_slice(self.dates(level), start, end)
+
+    def choose_level(self, start=None, end=None, max_rows=2000):
+        """Return the finest level with at most max_rows bars between start and end.
+
+        Falls back to the coarsest level when even that one has more.
+        """
+        for level in self.levels:
+            rows = self.date_range(level, start, end)
+            if rows.stop - rows.start <= max_rows:
+                return level
+        return self.levels[-1]
+
+    def series(self, level, field="Close"):
+        """Return (dates, values) of one field over the whole of level."""
+        return self.dates(level), self.values(level)[:, self.fields.index(field)]
+
+    def bars(self, level, start=None, end=None):
+        """Return the bars of level between start and end as a history DataFrame."""
+        rows = self.date_range(level, start, end)
+        return bars_frame(self.values(level)[rows], self.dates(level)[rows], self.fields)
+
+    def query(self, start=None, end=None, max_rows=2000):
+        """Return (level, bars) for the finest level that fits max_rows between start and end."""
+        level = self.choose_level(start, end, max_rows)
+        return level, self.bars(level, start, end)
+
+    def _load(self, level):
+        if level not in self._arrays:
+            base = os.path.join(self.directory, level)
+            self._arrays[level] = (
+                np.load(base + ".dates.npy"),
+                np.load(base + ".values.npy", mmap_mode="r"),
+            )
+        return self._arrays[level]
+
+
+if __name__ == "__main__":
+    for symbol in sys.argv[1:]:
+        meta = build_pyramid(symbol)
+        levels = ", ".join(f"{level['name']} {level['rows']}" for level in meta["levels"])
+        print(f"[INFO] Built {symbol} pyramid: {levels}.")
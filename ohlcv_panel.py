@@ -0,0 +1,182 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from cell_format import format_dates
+from file_helpers import replace_file, save_array, save_json
+from instrumentation import span
+
+# Constituent lists for each index universe
+INDEX_FILES = {
+    "sp500": "data/summary/wikipedia_sp500.csv",
+    "nasdaq": "data/summary/wikipedia_nasdaq.csv",
+    "dowjones": "data/summary/wikipedia_dowjones.csv",
+}
+
+FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+INTEGER_FIELDS = ("Volume",)
+
+
+def date_slice(dates, start=None, end=None):
+    """Return the slice of a sorted datetime64[s] array between start and end inclusive."""
+    lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start, "s"), "left")
+    hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, "s"), "right")
+    return slice(lo, hi)
+
+
+def bars_frame(block, dates, fields):
+    """Return a (rows, fields) float block and its dates as a history DataFrame.
+
+    Dates are ISO strings (with the time only if any bar has one); integer
+    fields without gaps are converted back to int64.
+    """
+    df = pd.DataFrame({"Date": format_dates(dates)})
+    for i, field in enumerate(fields):
+        column = block[:, i]
+        if field in INTEGER_FIELDS and not np.isnan(column).any():
+            column = column.astype(np.int64)
+        df[field] = column
+    return df
+
+
+def build_panel(index_name, history_dir="data/history", out_dir="data/panel", fields=FIELDS):
+    """Pack the history of every constituent of index_name into one memmap.
+
+    The panel is a float64 array of shape (dates, symbols, fields) stored in
+    {out_dir}/{index_name}.values.npy, with the date index in {index_name}.dates.npy
+    and the symbol and field lists in {index_name}.json, together with the mtime
+    and size of every history file packed. Missing bars are NaN.
+    Returns the number of symbols packed.
+    """
+    symbols = pd.read_csv(INDEX_FILES[index_name])["Symbol"].astype(str).tolist()
+
+    histories = {}
+    sources = {}
+    for symbol in symbols:
+        file_path = os.path.join(history_dir, f"{symbol}.csv")
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        sources[symbol] = [st.st_mtime_ns, st.st_size]
+        df = pd.read_csv(file_path, usecols=lambda name: name == "Date" or name in fields)
+        dates = pd.to_datetime(df["Date"]).to_numpy().astype("datetime64[s]")
+        histories[symbol] = (dates, df.reindex(columns=list(fields)).to_numpy(dtype=np.float64))
+
+    symbols = sorted(histories)
+    if histories:
+        all_dates = np.unique(np.concatenate([dates for dates, _ in histories.values()]))
+    else:
+        all_dates = np.array([], dtype="datetime64[s]")
+
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, index_name)
+    shape = (len(all_dates), len(symbols), len(fields))
+
+    def write_values(path):
+        values = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+        values[:] = np.nan
+        for col, symbol in enumerate(symbols):
+            dates, rows = histories[symbol]
+            values[np.searchsorted(all_dates, dates), col, :] = rows
+        values.flush()
+        del values
+
+    replace_file(base + ".values.npy", write_values)
+    save_array(base + ".dates.npy", all_dates)
+    # The .json is written last; it marks the panel as complete
+    save_json(base + ".json", {"symbols": symbols, "fields": list(fields), "sources": sources})
+    return len(symbols)
+
+
+class OhlcvPanel:
+    """Read-only view of a panel written by build_panel."""
+
+    def __init__(self, values, dates, symbols, fields, stale=()):
+        self.values = values
+        self.dates = dates
+        self.symbols = symbols
+        self.fields = fields
+        self.stale = set(stale)
+        # Symbols whose history changed since the build are not answered from the panel
+        self._symbol_pos = {symbol: i for i, symbol in enumerate(symbols) if symbol not in self.stale}
+        self._field_pos = {field: i for i, field in enumerate(fields)}
+
+    @classmethod
+    def open(cls, index_name, out_dir="data/panel", history_dir="data/history"):
+        """Memory-map the panel for index_name, or return None if it was never built.
+
+        Every history file is checked against the mtime and size recorded by
+        build_panel, once, here; symbols whose file changed are left out of
+        the panel (so their history is read from the file instead).
+        """
+        base = os.path.join(out_dir, index_name)
+        try:
+            with open(base + ".json") as f:
+                meta = json.load(f)
+            values = np.load(base + ".values.npy", mmap_mode="r")
+            dates = np.load(base + ".dates.npy")
+        except (OSError, ValueError):
+            return None
+        if "sources" not in meta:
+            # Built before source versions were recorded: freshness is unknown
+            return None
+        stale = []
+        for symbol, version in meta["sources"].items():
+            try:
+                st = os.stat(os.path.join(history_dir, f"{symbol}.csv"))
+            except OSError:
+                stale.append(symbol)
+                continue
+            if [st.st_mtime_ns, st.st_size] != version:
+                stale.append(symbol)
+        return cls(values, dates, meta["symbols"], meta["fields"], stale)
+
+    def __contains__(self, symbol):
+        return symbol in self._symbol_pos
+
+    def date_range(self, start=None, end=None):
+        """Return the slice of the date index between start and end inclusive."""
+        return date_slice(self.dates, start, end)
+
+    def symbol_history(self, symbol, start=None, end=None):
+        """Return the bars of symbol between start and end as a history DataFrame."""
+        rows = self.date_range(start, end)
+        return self._to_frame(self.values[rows, self._symbol_pos[symbol], :], self.dates[rows])
+
+    def symbol_tail(self, symbol, n_rows=100):
+        """Return the last n_rows bars of symbol, scanning back only as far as needed."""
+        with span("panel.slice", symbol=symbol):
+            return self._symbol_tail(symbol, n_rows)
+
+    def _symbol_tail(self, symbol, n_rows):
+        col = self._symbol_pos[symbol]
+        start = len(self.dates)
+        while start > 0:
+            start = max(0, start - 2 * n_rows)
+            block = self.values[start:, col, :]
+            if (~np.isnan(block).all(axis=1)).sum() >= n_rows:
+                break
+        return self._to_frame(self.values[start:, col, :], self.dates[start:]).tail(n_rows).reset_index(drop=True)
+
+    def _to_frame(self, block, dates):
+        # Drop dates on which this symbol has no bar at all
+        present = ~np.isnan(block).all(axis=1)
+        return bars_frame(block[present], dates[present], self.fields)
+
+    def cross_section(self, date, field="Close"):
+        """Return field for every symbol on date as a Series indexed by symbol."""
+        row = np.searchsorted(self.dates, np.datetime64(date, "s"))
+        if row == len(self.dates) or self.dates[row] != np.datetime64(date, "s"):
+            raise KeyError(date)
+        values = self.values[row, :, self._field_pos[field]].copy()
+        values[[i for i, symbol in enumerate(self.symbols) if symbol in self.stale]] = np.nan
+        return pd.Series(values, index=self.symbols, name=field)
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or INDEX_FILES:
+        print(f"[INFO] Built {name} panel with {build_panel(name)} symbols.")
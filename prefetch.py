@@ -0,0 +1,118 @@
+from PyQt6.QtCore import QObject, QRunnable, QThread, QThreadPool, QTimer
+
+from df_cache import file_key, shared_cache
+from instrumentation import count, span
+
+
+class PrefetchTask(QRunnable):
+    """Read one history file into the cache on a prefetch worker."""
+
+    def __init__(self, file_path, read_func, cache, variant):
+        super().__init__()
+        self.file_path = file_path
+        self.read_func = read_func
+        self.cache = cache
+        self.variant = variant
+
+    def run(self):
+        try:
+            key = file_key(self.file_path, self.variant)
+            if self.cache.contains(self.file_path, key):
+                return
+            with span("prefetch.load", file=self.file_path):
+                df = self.read_func(self.file_path, lambda percent: None, lambda: False)
+            self.cache.put(self.file_path, df, key)
+            count("prefetch.loaded")
+        except Exception:
+            # Prefetching is best effort; a real click reports the error
+            count("prefetch.failed")
+
+
+class HistoryPrefetcher(QObject):
+    """Load history for symbols near the current row of a table view in the background.
+
+    The prefetcher watches the view's current row and scroll position. Once
+    the user pauses, it queues the visible symbols and those within radius
+    rows of the current one, nearest first, on a single low-priority thread.
+    Results go into the (bounded) DataFrame cache, so a following click finds
+    them there. Queued work that has not started yet is dropped whenever the
+    view moves again.
+    """
+
+    def __init__(self, view, read_func, path_for_symbol, cache=shared_cache, variant=None,
+                 symbol_column=0, radius=10, delay_ms=150, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.read_func = read_func
+        self.path_for_symbol = path_for_symbol
+        self.cache = cache
+        self.variant = variant
+        self.symbol_column = symbol_column
+        self.radius = radius
+        self.enabled = True
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._pool.setThreadPriority(QThread.Priority.LowPriority)
+
+        # Debounce: wait until scrolling or arrow-key browsing pauses
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.prefetch)
+
+        view.verticalScrollBar().valueChanged.connect(self.schedule)
+        view.selectionModel().currentRowChanged.connect(self.schedule)
+        view.model().modelReset.connect(self.schedule)
+
+    def set_enabled(self, enabled):
+        """Turn prefetching on or off, dropping queued work when turned off."""
+        self.enabled = enabled
+        if not enabled:
+            self._timer.stop()
+            self._pool.clear()
+
+    def schedule(self, *args):
+        """Restart the debounce timer after the view moved."""
+        if self.enabled:
+            self._timer.start()
+
+    def candidate_rows(self):
+        """Return the rows worth prefetching, nearest to the current row first."""
+        model = self.view.model()
+        rows = model.rowCount()
+        if rows == 0:
+            return []
+
+        current = self.view.currentIndex().row()
+        first = max(self.view.rowAt(0), 0)
+        last = self.view.rowAt(self.view.viewport().height() - 1)
+        last = rows - 1 if last < 0 else last
+        anchor = current if current >= 0 else first
+
+        candidates = set(range(first, last + 1))
+        candidates.update(range(max(anchor - self.radius, 0), min(anchor + self.radius, rows - 1) + 1))
+        candidates.discard(current)
+        return sorted(candidates, key=lambda row: (abs(row - anchor), row))
+
+    def prefetch(self):
+        """Queue history loads for the candidate rows."""
+        if not self.enabled:
+            return
+        self._pool.clear()
+        model = self.view.model()
+        for row in self.candidate_rows():
+            symbol = model.index(row, self.symbol_column).data()
+            if not symbol:
+                continue
+            file_path = self.path_for_symbol(symbol)
+            self._pool.start(PrefetchTask(file_path, self.read_func, self.cache, self.variant))
+
+    def prefetch_symbols(self, symbols):
+        """Queue history loads for symbols regardless of the view (e.g. a restored session's)."""
+        for symbol in symbols:
+            self._pool.start(PrefetchTask(self.path_for_symbol(symbol), self.read_func, self.cache, self.variant))
+
+    def wait_for_done(self, msecs=-1):
+        """Block until queued prefetches finish (for benchmarks and shutdown)."""
+        return self._pool.waitForDone(msecs)
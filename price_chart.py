@@ -0,0 +1,224 @@
+from PyQt6.QtCore import Qt, QLineF, QPointF, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPen
+from PyQt6.QtWidgets import QWidget
+
+from instrumentation import span
+
+# Fewest points the chart can be zoomed in to
+MIN_VISIBLE_POINTS = 10
+ZOOM_STEP = 1.25
+# Pens for the second and later series when several are shown
+SERIES_COLORS = ("#d62728", "#2ca02c", "#ff7f0e", "#9467bd", "#8c564b", "#e377c2", "#17becf")
+
+
+def decimate_min_max(values, columns):
+    """Return the (min, max) of values in each of columns equal-width buckets.
+
+    values may be 2-D (points, series); every series is bucketed the same way.
+
+    Computed with one reduceat per bound, so the cost is a single pass over
+    values however many points fall into each pixel column. NaNs are ignored;
+    a bucket of only NaNs gives NaN.
+    """
+    import numpy as np
+
+    n = len(values)
+    columns = max(min(columns, n), 1)
+    edges = (np.arange(columns) * n) // columns
+    return np.fmin.reduceat(values, edges, axis=0), np.fmax.reduceat(values, edges, axis=0)
+
+
+class PriceChart(QWidget):
+    """Line chart of one price series (or several aligned ones), drawn with QPainter.
+
+    Only the visible range is drawn. When it holds more points than the
+    widget has pixel columns, each column shows the min-max range of its
+    points, so drawing cost depends on the widget width, not on the history
+    length. Scroll to zoom around the cursor, drag to pan, double-click to
+    show everything again.
+    """
+
+    view_changed = pyqtSignal(int, int)  # lo, hi of the visible points
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(200, 150)
+        self._values = None
+        self._labels = None
+        self.title = ""
+        self.names = []
+        self._lo = 0
+        self._hi = 0
+        self._decimated = None  # ((lo, hi, width), (xs, mins, maxs))
+        self._drag = None
+
+    def set_series(self, values, labels=None, title="", view=None, names=()):
+        """Show values (a float array) with optional per-point x labels (strings or datetime64).
+
+        A 2-D values array of shape (points, series) draws one line per
+        column, named by names in the legend. view is the (lo, hi) point range
+        to show; by default everything.
+        """
+        import numpy as np
+
+        self._values = np.asarray(values, dtype=float)
+        self._labels = labels
+        self.title = title
+        self.names = list(names)
+        self._decimated = None
+        self.set_view(*(view or (0, len(self._values))))
+
+    def append_values(self, values, labels=None):
+        """Extend the series, following its end if the view was showing it."""
+        import numpy as np
+
+        if self._values is None:
+            self.set_series(values, labels)
+            return
+        at_end = self._hi == len(self._values)
+        self._values = np.concatenate([self._values, np.asarray(values, dtype=float)])
+        if self._labels is not None and labels is not None:
+            self._labels = np.concatenate([np.asarray(self._labels), np.asarray(labels)])
+        self._decimated = None
+        if at_end:
+            self.set_view(self._lo + len(values), len(self._values))
+        self.update()
+
+    def clear(self):
+        """Remove the series."""
+        self._values = None
+        self._labels = None
+        self._decimated = None
+        self.update()
+
+    def view_range(self):
+        """Return the visible point range as (lo, hi)."""
+        return self._lo, self._hi
+
+    def set_view(self, lo, hi):
+        """Show points lo to hi (exclusive), clamped to the series."""
+        n = 0 if self._values is None else len(self._values)
+        visible = min(max(hi - lo, min(MIN_VISIBLE_POINTS, n)), n)
+        lo = min(max(lo, 0), n - visible)
+        changed = (lo, lo + visible) != (self._lo, self._hi)
+        self._lo, self._hi = lo, lo + visible
+        self.update()
+        if changed:
+            self.view_changed.emit(self._lo, self._hi)
+
+    def visible_columns(self):
+        """Return the (x, min, max) pixel columns for the visible range, decimating if needed."""
+        import numpy as np
+
+        width = max(self.width(), 1)
+        key = (self._lo, self._hi, width)
+        if self._decimated is None or self._decimated[0] != key:
+            values = self._values[self._lo:self._hi]
+            with span("chart.decimate", points=len(values), columns=width):
+                if len(values) > width:
+                    mins, maxs = decimate_min_max(values, width)
+                    xs = (np.arange(len(mins)) + 0.5) * width / len(mins)
+                else:
+                    mins = maxs = values
+                    xs = (np.arange(len(values)) + 0.5) * width / max(len(values), 1)
+            self._decimated = (key, (xs, mins, maxs))
+        return self._decimated[1]
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().base())
+        if self._values is None or self._hi <= self._lo:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No data")
+            return
+
+        import numpy as np
+
+        xs, mins, maxs = self.visible_columns()
+        valid = ~np.isnan(mins)
+        if not valid.any():
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No data")
+            return
+
+        low, high = float(np.nanmin(mins)), float(np.nanmax(maxs))
+        top, bottom = 20.0, self.height() - 20.0
+        scale = (bottom - top) / (high - low) if high > low else 0.0
+
+        def to_y(values):
+            return bottom - (values - low) * scale if scale else np.full(len(values), (top + bottom) / 2)
+
+        colors = [self.palette().highlight().color()] + [QColor(color) for color in SERIES_COLORS]
+        if mins.ndim == 1:
+            mins, maxs, valid = mins[:, None], maxs[:, None], valid[:, None]
+        for j in range(mins.shape[1]):
+            painter.setPen(QPen(colors[j % len(colors)], 1))
+            self._draw_series(painter, xs[valid[:, j]], mins[valid[:, j], j], maxs[valid[:, j], j], to_y)
+
+        painter.setPen(self.palette().text().color())
+        painter.drawText(4, 14, f"{self.title}  {high:.2f}")
+        painter.drawText(4, self.height() - 24, f"{low:.2f}")
+        if self.names:
+            # Legend: each name in the colour of its line, right-aligned on the title row
+            x = self.width() - 4
+            for j in reversed(range(len(self.names))):
+                x -= painter.fontMetrics().horizontalAdvance(self.names[j] + " ")
+                painter.setPen(colors[j % len(colors)])
+                painter.drawText(x, 14, self.names[j])
+            painter.setPen(self.palette().text().color())
+        if self._labels is not None:
+            painter.drawText(4, self.height() - 4, self.label(self._lo))
+            right = self.label(self._hi - 1)
+            painter.drawText(self.width() - 4 - painter.fontMetrics().horizontalAdvance(right),
+                             self.height() - 4, right)
+
+    def _draw_series(self, painter, xs, mins, maxs, to_y):
+        import numpy as np
+
+        if not len(xs):
+            return
+        if self._hi - self._lo <= max(self.width(), 1):
+            # One point per column or fewer: a plain polyline
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.drawPolyline([QPointF(x, y) for x, y in zip(xs, to_y(mins))])
+        else:
+            # One vertical bar per column, stretched to meet the previous bar
+            lows = np.fmin(mins, np.concatenate([mins[:1], maxs[:-1]]))
+            highs = np.fmax(maxs, np.concatenate([maxs[:1], mins[:-1]]))
+            painter.drawLines([QLineF(x, y0, x, y1) for x, y0, y1 in zip(xs, to_y(lows), to_y(highs))])
+
+    def label(self, i):
+        """Return the x label of point i as text."""
+        label = self._labels[i]
+        if getattr(label, "dtype", None) is not None and label.dtype.kind == "M":
+            from cell_format import format_dates
+            return format_dates(label.reshape(1))[0]
+        return str(label)
+
+    def wheelEvent(self, event):
+        if self._values is None:
+            return
+        # Zoom around the point under the cursor
+        fraction = event.position().x() / max(self.width(), 1)
+        visible = self._hi - self._lo
+        zoomed = visible / ZOOM_STEP if event.angleDelta().y() > 0 else visible * ZOOM_STEP
+        zoomed = int(round(zoomed))
+        anchor = self._lo + fraction * visible
+        lo = int(round(anchor - fraction * zoomed))
+        self.set_view(lo, lo + zoomed)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag = (event.position().x(), self._lo, self._hi)
+
+    def mouseMoveEvent(self, event):
+        if self._drag is None:
+            return
+        x, lo, hi = self._drag
+        shift = int(round((x - event.position().x()) / max(self.width(), 1) * (hi - lo)))
+        self.set_view(lo + shift, hi + shift)
+
+    def mouseReleaseEvent(self, event):
+        self._drag = None
+
+    def mouseDoubleClickEvent(self, event):
+        if self._values is not None:
+            self.set_view(0, len(self._values))
@@ -0,0 +1,162 @@
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from file_helpers import save_json
+from instrumentation import count, span
+
+# Columns added to a constituents table, in display order
+METRICS = ("Last Close", "1M Return %", "1Y Return %", "Volatility %", "Avg Volume")
+
+# Kept with the column store, so a restored session shows the columns without parsing
+CACHE_PATH = "data/store/screener.json"
+CACHE_VERSION = 1
+
+
+def _file_version(file_path):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def symbol_metrics(file_path):
+    """Return the METRICS values for one history CSV (NaN where unavailable).
+
+    Returns are measured against the last close on or before one month and
+    one year back; volatility is the standard deviation of the log returns
+    of the last year scaled by the square root of their count (i.e.
+    annualized whatever the bar size); average volume is over the last month.
+    Runs in a worker process.
+    """
+    try:
+        df = pd.read_csv(file_path, usecols=lambda name: name in ("Date", "Close", "Volume"))
+    except (OSError, ValueError):
+        return (np.nan,) * len(METRICS)
+    if df.empty or "Close" not in df.columns:
+        return (np.nan,) * len(METRICS)
+
+    dates = pd.to_datetime(df["Date"]).to_numpy()
+    close = df["Close"].to_numpy(dtype=float)
+    last_date = pd.Timestamp(dates[-1])
+
+    def since(offset):
+        # First row after last_date - offset
+        return np.searchsorted(dates, (last_date - offset).to_datetime64(), "right")
+
+    def change(offset):
+        row = since(offset) - 1
+        return (close[-1] / close[row] - 1) * 100 if row >= 0 else np.nan
+
+    month, year = since(pd.DateOffset(months=1)), since(pd.DateOffset(years=1))
+    log_returns = np.diff(np.log(close[max(year - 1, 0):]))
+    volatility = np.nanstd(log_returns) * np.sqrt(len(log_returns)) * 100 if len(log_returns) > 1 else np.nan
+    volume = df["Volume"].to_numpy(dtype=float)[month:].mean() if "Volume" in df.columns else np.nan
+    return (
+        close[-1],
+        change(pd.DateOffset(months=1)),
+        change(pd.DateOffset(years=1)),
+        volatility,
+        volume,
+    )
+
+
+class Screener:
+    """Compute METRICS for many history files on a process pool.
+
+    Results are cached per file path and version (mtime and size), in
+    memory and in cache_path, so screening an index again, in this process
+    or the next, only submits the files that changed, and nothing at all
+    (no pool start-up either) when none did. The pool is started on first
+    use and kept until shutdown.
+    """
+
+    def __init__(self, history_dir="data/history", max_workers=None, cache_path=CACHE_PATH):
+        self.history_dir = history_dir
+        self.max_workers = max_workers
+        self.cache_path = cache_path
+        self._executor = None
+        self._results = self._load_results()  # file path -> (version, metrics)
+        self._lock = threading.Lock()
+
+    def _load_results(self):
+        try:
+            with open(self.cache_path) as f:
+                saved = json.load(f)
+            if saved.get("version") != CACHE_VERSION:
+                return {}
+            return {path: (version and tuple(version), tuple(metrics))
+                    for path, (version, metrics) in saved["results"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+
+    def _save_results(self):
+        """Write the cached results to cache_path; failures are ignored (they are recomputed)."""
+        with self._lock:
+            results = {path: [version, [float(value) for value in metrics]]
+                       for path, (version, metrics) in self._results.items()}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            save_json(self.cache_path, {"version": CACHE_VERSION, "results": results})
+        except OSError:
+            pass
+
+    def metrics(self, symbols, is_cancelled=lambda: False):
+        """Return a DataFrame of Symbol plus METRICS for symbols."""
+        paths = [os.path.join(self.history_dir, f"{symbol}.csv") for symbol in symbols]
+        versions = [_file_version(path) for path in paths]
+        with self._lock:
+            cached = {path: entry[1] for path, version in zip(paths, versions)
+                      if (entry := self._results.get(path)) is not None and entry[0] == version}
+        missing = [path for path in dict.fromkeys(paths) if path not in cached]
+        # Cache against the versions seen before computing, so a file that changes meanwhile is redone
+        submitted = dict(zip(paths, versions))
+        count("screener.hit", len(paths) - len(missing))
+        count("screener.miss", len(missing))
+
+        if missing:
+            with span("screener.compute", files=len(missing)):
+                computed = self._compute(missing, is_cancelled)
+            with self._lock:
+                for path, metrics in computed.items():
+                    self._results[path] = (submitted[path], metrics)
+            self._save_results()
+            cached.update(computed)
+
+        rows = [cached.get(path, (np.nan,) * len(METRICS)) for path in paths]
+        df = pd.DataFrame(rows, columns=list(METRICS))
+        df.insert(0, "Symbol", list(symbols))
+        return df
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _compute(self, paths, is_cancelled):
+        if self._executor is None:
+            # Spawn rather than fork the (threaded) Qt process. Each worker still re-imports the
+            # main script as __mp_main__, so that script must keep its start-up under a
+            # __name__ == "__main__" guard; symbol_metrics itself needs only pandas and NumPy
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        futures = {path: self._executor.submit(symbol_metrics, path) for path in paths}
+        results = {}
+        for path, future in futures.items():
+            if is_cancelled():
+                for pending in futures.values():
+                    pending.cancel()
+                break
+            if future.exception() is not None:
+                # A file the metrics cannot be computed for gets a row of NaN
+                count("screener.failed")
+                results[path] = (np.nan,) * len(METRICS)
+            else:
+                results[path] = future.result()
+        return results
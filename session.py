@@ -0,0 +1,29 @@
+import json
+import os
+
+from file_helpers import save_json
+
+# Kept next to the column store, the persistent cache it warm-starts from
+SESSION_PATH = "data/store/session.json"
+SESSION_VERSION = 1
+
+
+def load_session(path=SESSION_PATH):
+    """Return the saved session snapshot, or an empty dict if there is none (or it is unreadable)."""
+    try:
+        with open(path) as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(session, dict) or session.get("version") != SESSION_VERSION:
+        return {}
+    return session
+
+
+def save_session(session, path=SESSION_PATH):
+    """Write the session snapshot atomically; failures are ignored (it is only a convenience)."""
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        save_json(path, dict(session, version=SESSION_VERSION))
+    except OSError:
+        pass
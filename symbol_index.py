@@ -0,0 +1,82 @@
+import bisect
+
+# Columns that may hold the company name in the constituent files
+NAME_COLUMNS = ("Security", "Company", "Name")
+
+
+class SymbolIndex:
+    """Prefix index over ticker symbols and security names.
+
+    Keys are kept in sorted lists, so a completion is two bisections plus
+    reading off the matches. Symbol matches are listed before name matches;
+    every word of a name is indexed so "bank" finds "Bank of America".
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (symbol, name, index_name)
+        self.symbols = []
+        self.names = []
+        self.indexes = []
+        positions = {}
+        for symbol, name, index_name in entries:
+            if symbol in positions:
+                self.indexes[positions[symbol]].append(index_name)
+                continue
+            positions[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.names.append(name)
+            self.indexes.append([index_name])
+
+        symbol_keys = sorted((symbol.upper(), i) for i, symbol in enumerate(self.symbols))
+        name_keys = sorted(
+            {(word, i) for i, name in enumerate(self.names) for word in self._name_words(name)}
+        )
+        self._symbol_keys = [key for key, _ in symbol_keys]
+        self._symbol_targets = [i for _, i in symbol_keys]
+        self._name_keys = [key for key, _ in name_keys]
+        self._name_targets = [i for _, i in name_keys]
+
+    @classmethod
+    def from_files(cls, csv_files, read_func=None):
+        """Build the index from a mapping of index name to constituent CSV path.
+
+        read_func(file_path) returns the DataFrame of a file (pd.read_csv by default).
+        """
+        if read_func is None:
+            import pandas as pd
+            read_func = pd.read_csv
+
+        entries = []
+        for index_name, file_path in csv_files.items():
+            df = read_func(file_path)
+            name_column = next((c for c in NAME_COLUMNS if c in df.columns), None)
+            names = df[name_column].fillna("").astype(str) if name_column else [""] * len(df)
+            for symbol, name in zip(df["Symbol"].astype(str), names):
+                entries.append((symbol, name, index_name))
+        return cls(entries)
+
+    def complete(self, prefix, limit=20):
+        """Return up to limit (symbol, name) pairs whose symbol or name starts with prefix."""
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return []
+
+        found = []
+        seen = set()
+        for keys, targets in ((self._symbol_keys, self._symbol_targets), (self._name_keys, self._name_targets)):
+            start = bisect.bisect_left(keys, prefix)
+            end = bisect.bisect_left(keys, prefix + "\uffff", start)
+            for i in targets[start:end]:
+                if i in seen:
+                    continue
+                seen.add(i)
+                found.append((self.symbols[i], self.names[i]))
+                if len(found) >= limit:
+                    return found
+        return found
+
+    @staticmethod
+    def _name_words(name):
+        words = name.upper().split()
+        # The full name, plus every word so a search can start mid-name
+        return [" ".join(words[i:]) for i in range(len(words))]
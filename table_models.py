@@ -0,0 +1,330 @@
+import bisect
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# Rows formatted together when the view first asks for a cell in a block
+FORMAT_BLOCK_ROWS = 4096
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """Read-only table model backed directly by a pandas DataFrame.
+
+    Rows are handed to the view fetch_size at a time through Qt's
+    canFetchMore/fetchMore protocol, so the view only lays out what the user
+    has scrolled to. Pass fetch_size=None to expose every row at once.
+
+    Display strings are produced a block of rows at a time by the vectorized
+    cell_format.format_column and cached, so repaints only index into them.
+
+    Sorting and filtering never touch the cells: the model keeps a row
+    permutation built from cached per-column argsort orders and boolean
+    prefix masks, and maps view rows to DataFrame rows through it.
+    """
+
+    def __init__(self, df=None, parent=None, fetch_size=1000):
+        super().__init__(parent)
+        self.fetch_size = fetch_size
+        self._df = None
+        self._columns = []
+        self._headers = []
+        self._fetched = 0
+        self._formatted = {}    # (column, block) -> array of display strings
+        self._rows = None       # view row -> DataFrame row, None for identity
+        self._sort = None       # (column, ascending)
+        self._filter = None     # (column, prefix)
+        self._sort_orders = {}  # (column, ascending) -> argsort permutation
+        self._filter_keys = {}  # column -> upper-cased strings for prefix matching
+        if df is not None:
+            self.set_dataframe(df)
+
+    def set_dataframe(self, df):
+        """Replace the DataFrame shown by the model, keeping the current sort and filter."""
+        self.beginResetModel()
+        self._df = df
+        # Keep one NumPy array per column so data() is a plain array lookup
+        self._columns = [df.iloc[:, i].to_numpy() for i in range(df.shape[1])]
+        self._headers = [str(name) for name in df.columns]
+        self._formatted = {}
+        self._sort_orders = {}
+        self._filter_keys = {}
+        self._update_rows()
+        self.endResetModel()
+
+    def append_dataframe(self, df):
+        """Add the rows of df (same columns) after the current ones without a model reset."""
+        import pandas as pd
+
+        if self._df is None or list(df.columns) != list(self._df.columns):
+            self.set_dataframe(df if self._df is None else pd.concat([self._df, df], ignore_index=True))
+            return
+        if df.empty:
+            return
+
+        old_rows = len(self._df)
+        old_total = self.total_rows()
+        old_dtypes = [values.dtype for values in self._columns]
+        self._df = pd.concat([self._df, df], ignore_index=True)
+        self._columns = [self._df.iloc[:, i].to_numpy() for i in range(self._df.shape[1])]
+        if [values.dtype for values in self._columns] != old_dtypes:
+            self._formatted = {}
+        else:
+            # Only the block holding the old last row and the ones after it changed
+            first_block = old_rows // FORMAT_BLOCK_ROWS
+            self._formatted = {key: strings for key, strings in self._formatted.items() if key[1] < first_block}
+        self._sort_orders = {}
+        self._filter_keys = {}
+
+        if self._sort or self._filter:
+            # New rows may land anywhere in a sorted or filtered view
+            self.beginResetModel()
+            self._update_rows()
+            self.endResetModel()
+            return
+
+        # File order: the new rows go at the end, visibly only if everything was fetched
+        if self._fetched == old_total:
+            self.beginInsertRows(QModelIndex(), old_total, len(self._df) - 1)
+            self._fetched = len(self._df)
+            self.endInsertRows()
+
+    def clear(self):
+        """Remove all rows and columns from the model."""
+        self.beginResetModel()
+        self._df = None
+        self._columns = []
+        self._headers = []
+        self._fetched = 0
+        self._formatted = {}
+        self._rows = None
+        self._sort_orders = {}
+        self._filter_keys = {}
+        self.endResetModel()
+
+    def dataframe(self):
+        """Return the DataFrame shown by the model."""
+        return self._df
+
+    def total_rows(self):
+        """Return the number of rows available, fetched or not."""
+        if self._rows is not None:
+            return len(self._rows)
+        return 0 if self._df is None else len(self._df)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._headers)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._fetched < self.total_rows()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.fetch_size or self.total_rows(), self.total_rows() - self._fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def source_row(self, row):
+        """Return the DataFrame row shown at view row."""
+        return row if self._rows is None else int(self._rows[row])
+
+    def value(self, row, column):
+        """Return the raw value at row and column."""
+        return self._columns[column][self.source_row(row)]
+
+    def display_text(self, row, column):
+        """Return the display string at row and column, formatting its block on first use."""
+        row = self.source_row(row)
+        block = row // FORMAT_BLOCK_ROWS
+        strings = self._formatted.get((column, block))
+        if strings is None:
+            start = block * FORMAT_BLOCK_ROWS
+            strings = self._format(column, self._columns[column][start:start + FORMAT_BLOCK_ROWS])
+            self._formatted[(column, block)] = strings
+        return strings[row % FORMAT_BLOCK_ROWS]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        # Cells are only formatted when the view asks for them, i.e. for visible rows
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.display_text(index.row(), index.column())
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sort by column (called by the view); a negative column restores file order."""
+        self._sort = None if column < 0 else (column, order == Qt.SortOrder.AscendingOrder)
+        self.beginResetModel()
+        self._update_rows()
+        self.endResetModel()
+
+    def set_filter(self, column, prefix):
+        """Show only rows whose column starts with prefix (case-insensitive)."""
+        self._filter = (column, prefix.upper()) if prefix else None
+        self.beginResetModel()
+        self._update_rows()
+        self.endResetModel()
+
+    def _update_rows(self):
+        # Combine the cached sort permutation and filter mask into one row mapping
+        import numpy as np
+
+        if self._df is None:
+            self._rows = None
+            self._fetched = 0
+            return
+
+        order = self._sort_order(*self._sort) if self._sort and self._sort[0] < len(self._columns) else None
+        mask = self._filter_mask(*self._filter) if self._filter and self._filter[0] < len(self._columns) else None
+        if mask is None:
+            self._rows = order
+        elif order is None:
+            self._rows = np.flatnonzero(mask)
+        else:
+            self._rows = order[mask[order]]
+
+        total = self.total_rows()
+        self._fetched = total if self.fetch_size is None else min(total, self.fetch_size)
+
+    def _sort_order(self, column, ascending):
+        key = (column, ascending)
+        if key not in self._sort_orders:
+            import pandas as pd
+
+            values = pd.Series(self._columns[column])
+            ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+            self._sort_orders[key] = ordered.index.to_numpy()
+        return self._sort_orders[key]
+
+    def _filter_mask(self, column, prefix):
+        keys = self._filter_keys.get(column)
+        if keys is None:
+            import pandas as pd
+
+            keys = pd.Series(self._columns[column]).astype(str).str.upper()
+            self._filter_keys[column] = keys
+        return keys.str.startswith(prefix).to_numpy()
+
+    def _format(self, column, values):
+        # Deferred import: keeps numpy and pandas out of application startup
+        from cell_format import format_column
+        return format_column(self._headers[column], values)
+
+
+class ChunkedCsvTableModel(DataFrameTableModel):
+    """Table model that reads a CSV file chunk by chunk as the view scrolls.
+
+    Only the first chunk is parsed when the file is opened; fetchMore parses
+    the next one, so time-to-first-paint does not depend on the file size.
+    """
+
+    def __init__(self, file_path=None, parent=None, fetch_size=1000):
+        super().__init__(parent=parent, fetch_size=fetch_size)
+        self._reader = None
+        self._chunks = []
+        self._offsets = []
+        if file_path is not None:
+            self.set_file(file_path)
+
+    def set_file(self, file_path):
+        """Start showing file_path, parsing only its first chunk."""
+        import pandas as pd
+
+        reader = pd.read_csv(file_path, chunksize=self.fetch_size or 1000)
+        self.beginResetModel()
+        self._close_reader()
+        self._reader = reader
+        self._chunks = []
+        self._offsets = []
+        self._fetched = 0
+        self._formatted = {}
+        self._df = None
+        first = self._next_chunk()
+        if first is not None:
+            self._append(first)
+        self._headers = [str(name) for name in first.columns] if first is not None else []
+        self.endResetModel()
+
+    def clear(self):
+        self._close_reader()
+        self._chunks = []
+        self._offsets = []
+        super().clear()
+
+    def dataframe(self):
+        """Return the rows parsed so far as one DataFrame."""
+        if self._df is None and self._chunks:
+            import pandas as pd
+
+            self._df = pd.concat([chunk for chunk, _ in self._chunks], ignore_index=True)
+        return self._df
+
+    def total_rows(self):
+        return self._fetched
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._reader is not None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sorting needs the whole file, so a chunked model keeps file order."""
+
+    def set_filter(self, column, prefix):
+        """Filtering needs the whole file, so a chunked model shows every row."""
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._reader is None:
+            return
+        chunk = self._next_chunk()
+        if chunk is None:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + len(chunk) - 1)
+        self._append(chunk)
+        self.endInsertRows()
+
+    def value(self, row, column):
+        i = bisect.bisect_right(self._offsets, row) - 1
+        return self._chunks[i][1][column][row - self._offsets[i]]
+
+    def display_text(self, row, column):
+        # Chunks are fetch_size rows, so each chunk is formatted as one block
+        i = bisect.bisect_right(self._offsets, row) - 1
+        strings = self._formatted.get((column, i))
+        if strings is None:
+            strings = self._format(column, self._chunks[i][1][column])
+            self._formatted[(column, i)] = strings
+        return strings[row - self._offsets[i]]
+
+    def _next_chunk(self):
+        try:
+            chunk = next(self._reader)
+        except StopIteration:
+            chunk = None
+        if chunk is None or chunk.empty:
+            self._close_reader()
+            return None
+        return chunk
+
+    def _append(self, chunk):
+        self._offsets.append(self._fetched)
+        self._chunks.append((chunk, [chunk.iloc[:, i].to_numpy() for i in range(chunk.shape[1])]))
+        self._fetched += len(chunk)
+        self._df = None
+
+    def _close_reader(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
@@ -0,0 +1,158 @@
+import io
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from history_query import DateIndex, query_history
+
+HEADER = "Date,Open,High,Low,Close,Adj Close,Volume"
+
+
+class Indexes:
+    """DateIndexCache stand-in with a configurable step, so short files span many samples."""
+
+    def __init__(self, step):
+        self.step = step
+        self._indexes = {}
+
+    def get(self, file_path):
+        index = self._indexes.get(file_path)
+        if index is None:
+            index = self._indexes[file_path] = DateIndex.open(file_path, self.step)
+        else:
+            index.refresh()
+        return index
+
+
+def history_lines(first, rows):
+    """Return rows history records with three bars a day, starting at bar first."""
+    lines = []
+    for i in range(first, first + rows):
+        date = pd.Timestamp("2020-01-01 09:00") + pd.Timedelta(days=i // 3, hours=i % 3)
+        lines.append(f"{date:%Y-%m-%d %H:%M:%S},{i}.25,{i + 1}.5,{i - 1}.5,{i}.75,{i}.75,{1000 + i}")
+    return lines
+
+
+def write(path, lines, eol="\n", blank_every=0, mode="w"):
+    with open(path, mode, newline="") as f:
+        for i, line in enumerate(lines):
+            if blank_every and i and i % blank_every == 0:
+                f.write(eol)
+            f.write(line + eol)
+
+
+def expected(path, columns=None, start=None, end=None, period=None, max_rows=None):
+    """Return what query_history should give, computed from a full read of path.
+
+    Only newline-terminated records count: a partly written last one is left out.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    full = pd.read_csv(io.BytesIO(data[:data.rfind(b"\n") + 1]))
+    dates = pd.to_datetime(full["Date"])
+    if start is None and period is not None:
+        start = dates.iloc[-1] - pd.Timedelta(period)
+    keep = np.ones(len(full), dtype=bool)
+    if start is not None:
+        keep &= (dates >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        keep &= (dates <= pd.Timestamp(end)).to_numpy()
+    names = [name for name in full.columns if columns is None or name == "Date" or name in columns]
+    df = full[keep][names]
+    if max_rows is not None:
+        df = df.tail(max_rows)
+    return df.reset_index(drop=True)
+
+
+def check_random_windows(path, indexes, seed, queries=200):
+    full = expected(path)
+    rng = random.Random(seed)
+    for _ in range(queries):
+        lo, hi = sorted(rng.sample(range(len(full)), 2))
+        start = None if rng.random() < 0.3 else full["Date"][lo]
+        end = None if rng.random() < 0.3 else full["Date"][hi]
+        if rng.random() < 0.2:
+            # A date only, falling between the bars of a day
+            start = full["Date"][lo][:10]
+        query = dict(columns=rng.choice([None, ["Close"], ["Close", "Volume"]]), start=start, end=end,
+                     max_rows=rng.choice([None, 1, 5, 40, 500]))
+        pd.testing.assert_frame_equal(query_history(path, indexes=indexes, **query), expected(path, **query))
+
+
+@pytest.mark.parametrize("step", [3, 256])
+@pytest.mark.parametrize("eol,blank_every", [("\n", 0), ("\r\n", 0), ("\n", 17), ("\r\n", 17)])
+def test_windows_match_full_read(tmp_path, step, eol, blank_every):
+    path = str(tmp_path / "SYM.csv")
+    write(path, [HEADER] + history_lines(0, 900), eol, blank_every)
+    check_random_windows(path, Indexes(step), seed=step)
+
+
+def test_period_matches_full_read(tmp_path):
+    path = str(tmp_path / "SYM.csv")
+    write(path, [HEADER] + history_lines(0, 900))
+    for period in ("1D", "92D", "10000D"):
+        pd.testing.assert_frame_equal(query_history(path, ["Close"], period=period, indexes=Indexes(3)),
+                                      expected(path, ["Close"], period=period))
+
+
+def test_empty_window(tmp_path):
+    path = str(tmp_path / "SYM.csv")
+    write(path, [HEADER] + history_lines(0, 90))
+    indexes = Indexes(3)
+    assert query_history(path, start="2030-01-01", indexes=indexes).empty
+    assert query_history(path, end="1990-01-01", indexes=indexes).empty
+    assert list(query_history(path, ["Close"], start="2020-02-01", end="2020-01-01", indexes=indexes).columns) == \
+        ["Date", "Close"]
+
+
+@pytest.mark.parametrize("eol", ["\n", "\r\n"])
+def test_appends_extend_the_index(tmp_path, eol):
+    path = str(tmp_path / "SYM.csv")
+    write(path, [HEADER] + history_lines(0, 300), eol)
+    indexes = Indexes(3)
+    check_random_windows(path, indexes, seed=1, queries=20)
+
+    # An append ending in a partial record, then the rest of that record
+    lines = history_lines(300, 50)
+    write(path, lines[:49], eol, blank_every=11, mode="a")
+    with open(path, "a", newline="") as f:
+        f.write(lines[49][:12])
+    check_random_windows(path, indexes, seed=2, queries=20)
+    with open(path, "a", newline="") as f:
+        f.write(lines[49][12:] + eol)
+    check_random_windows(path, indexes, seed=3, queries=50)
+
+    index = indexes.get(path)
+    rebuilt = DateIndex.build(path, 3)
+    assert index.rows == rebuilt.rows == 350
+    np.testing.assert_array_equal(index.offsets, rebuilt.offsets)
+    np.testing.assert_array_equal(index.dates, rebuilt.dates)
+    assert index.meta["last_date"] == rebuilt.meta["last_date"]
+
+
+def test_rewrites_rebuild_the_index(tmp_path):
+    path = str(tmp_path / "SYM.csv")
+    lines = [HEADER] + history_lines(0, 300)
+    write(path, lines)
+    indexes = Indexes(3)
+    check_random_windows(path, indexes, seed=1, queries=20)
+
+    # Same head, different and longer tail: not an append
+    write(path, lines[:200] + history_lines(400, 150))
+    check_random_windows(path, indexes, seed=2, queries=50)
+    # Same size, one value edited before the indexed end
+    with open(path, "r+b") as f:
+        f.seek(len(HEADER) + 1 + len("2020-01-01 09:00:00,"))
+        f.write(b"3")
+    check_random_windows(path, indexes, seed=3, queries=50)
+
+
+def test_sidecar_is_reused(tmp_path):
+    path = str(tmp_path / "SYM.csv")
+    write(path, [HEADER] + history_lines(0, 300))
+    built = DateIndex.build(path, 3)
+    loaded = DateIndex.load(path)
+    assert loaded.meta == built.meta
+    np.testing.assert_array_equal(loaded.offsets, built.offsets)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import DEFAULT_INDICATORS, IndicatorEngine
+from instrumentation import tracer
+
+
+def history(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    return pd.DataFrame({
+        "Date": pd.date_range("2020-01-01", periods=rows, freq="D").strftime("%Y-%m-%d"),
+        "Open": close * (1 + rng.normal(0, 0.002, rows)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(100_000, 1_000_000, rows),
+    })
+
+
+@pytest.mark.parametrize("first,chunks", [(400, [1, 7, 92]), (5, [1, 1, 30]), (30, [200])])
+def test_append_matches_compute(first, chunks):
+    df = history(first + sum(chunks))
+    engine = IndicatorEngine()
+    shown = engine.compute("SYM", df.iloc[:first])
+    rows = first
+    for new_rows in chunks:
+        rows += new_rows
+        added = engine.append("SYM", df.iloc[:rows], new_rows)
+        assert list(added.index) == list(df.index[rows - new_rows:rows])
+        shown = pd.concat([shown, added])
+
+    reference = IndicatorEngine().compute("SYM", df)
+    pd.testing.assert_frame_equal(shown, reference, rtol=1e-13, atol=1e-13)
+
+
+def test_compute_is_memoized_per_version():
+    df = history(100)
+    engine = IndicatorEngine()
+    first = engine.compute("SYM", df, version=1)
+    hits = tracer.counters.get("indicators.hit", 0)
+    pd.testing.assert_frame_equal(engine.compute("SYM", df, version=1), first)
+    assert tracer.counters["indicators.hit"] == hits + len(DEFAULT_INDICATORS)
+    changed = df.assign(Close=df["Close"] * 2)
+    recomputed = engine.compute("SYM", changed, version=2)
+    pd.testing.assert_frame_equal(recomputed, IndicatorEngine().compute("SYM", changed))
+
+
+def test_append_without_memo_computes_everything():
+    df = history(120)
+    added = IndicatorEngine().append("SYM", df, 20, DEFAULT_INDICATORS)
+    pd.testing.assert_frame_equal(added, IndicatorEngine().compute("SYM", df).iloc[100:])
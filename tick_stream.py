@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import deque
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QTimer, pyqtSignal
+
+from instrumentation import count, span
+
+
+class TickSource:
+    """Interface for a producer of streaming ticks.
+
+    A source delivers ticks, each a tuple of values in the order of columns,
+    by calling push(ticks) with a list of them from its own thread. start and
+    stop must not block the UI thread.
+    """
+
+    columns = ()
+
+    def start(self, push):
+        """Begin producing ticks, handing each batch to push."""
+        raise NotImplementedError
+
+    def stop(self):
+        """Stop producing ticks."""
+        raise NotImplementedError
+
+
+class CsvReplaySource(TickSource):
+    """Replay the rows of a history CSV as ticks at a fixed rate (a stand-in for a live feed)."""
+
+    # Seconds to wait before reading a file again after a pass with no rows
+    EMPTY_RETRY_SECONDS = 1.0
+
+    def __init__(self, file_path, rate=1000, loop=True, chunksize=10_000):
+        import pandas as pd
+
+        self.file_path = file_path
+        self.rate = rate
+        self.loop = loop
+        self.chunksize = chunksize
+        self.columns = tuple(str(name) for name in pd.read_csv(file_path, nrows=0).columns)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, push):
+        self.stop()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(push,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, push):
+        import pandas as pd
+
+        started = time.perf_counter()
+        sent = 0
+        while not self._stop.is_set():
+            sent_before = sent
+            with pd.read_csv(self.file_path, chunksize=self.chunksize) as reader:
+                for chunk in reader:
+                    rows = list(chunk.itertuples(index=False, name=None))
+                    while rows and not self._stop.is_set():
+                        # Send whatever is due by now, then nap briefly
+                        due = int((time.perf_counter() - started) * self.rate) - sent
+                        if due > 0:
+                            batch = rows[:due]
+                            del rows[:due]
+                            push(batch)
+                            sent += len(batch)
+                        else:
+                            time.sleep(0.002)
+                    if self._stop.is_set():
+                        return
+            if not self.loop:
+                return
+            if sent == sent_before:
+                # A file without rows: look again now and then rather than spin
+                if self._stop.wait(self.EMPTY_RETRY_SECONDS):
+                    return
+                started, sent = time.perf_counter(), 0
+
+
+class TickBuffer:
+    """Thread-safe ring buffer holding the ticks received since the last drain.
+
+    Only the newest capacity ticks are kept; older ones are dropped (and
+    counted), since a view can never show more than that anyway.
+    """
+
+    def __init__(self, capacity=1000):
+        self._ticks = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.received = 0
+        self.dropped = 0
+
+    def push(self, ticks):
+        """Add a batch of ticks (called from the producer thread)."""
+        with self._lock:
+            self.dropped += max(len(self._ticks) + len(ticks) - self._ticks.maxlen, 0)
+            self._ticks.extend(ticks)
+            self.received += len(ticks)
+
+    def drain(self):
+        """Remove and return every buffered tick, oldest first."""
+        with self._lock:
+            ticks = list(self._ticks)
+            self._ticks.clear()
+        return ticks
+
+
+class StreamTableModel(QAbstractTableModel):
+    """Table model showing the newest capacity ticks in arrival order.
+
+    Ticks are appended in batches: each batch is formatted column by column
+    with cell_format.format_column and announced with one beginInsertRows
+    (while the table is filling) or one dataChanged over the shifted rows.
+    """
+
+    def __init__(self, columns=(), capacity=100, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self._headers = list(columns)
+        self._rows = deque(maxlen=capacity)
+
+    def set_columns(self, columns):
+        """Empty the model and show ticks with the given columns."""
+        self.beginResetModel()
+        self._headers = list(columns)
+        self._rows.clear()
+        self.endResetModel()
+
+    def append_ticks(self, ticks):
+        """Append a batch of ticks, dropping the oldest rows beyond capacity."""
+        import pandas as pd
+        from cell_format import format_column
+
+        ticks = ticks[-self.capacity:]
+        if not ticks:
+            return
+        df = pd.DataFrame(ticks, columns=self._headers)
+        strings = [format_column(name, df[name].to_numpy()) for name in self._headers]
+        rows = list(zip(*strings))
+
+        old = len(self._rows)
+        added = min(len(rows), self.capacity - old)
+        if added > 0:
+            self.beginInsertRows(QModelIndex(), old, old + added - 1)
+            self._rows.extend(rows[:added])
+            self.endInsertRows()
+        if added < len(rows):
+            # The table is full: the rows shift up, so every row shows new text
+            self._rows.extend(rows[added:])
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, len(self._headers) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+
+class TickStreamer(QObject):
+    """Connect a TickSource to a StreamTableModel at a bounded frame rate.
+
+    The source pushes into a TickBuffer from its own thread; a UI-thread timer
+    drains the buffer at most fps times a second and hands the whole batch to
+    the model, so the view repaints once per frame however fast ticks arrive.
+    """
+
+    flushed = pyqtSignal(int)  # ticks shown in the flush
+
+    def __init__(self, model, fps=30, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.source = None
+        self.buffer = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(int(1000 / fps), 1))
+        self._timer.timeout.connect(self.flush)
+
+    def start(self, source):
+        """Show the ticks of source, replacing any running stream."""
+        self.stop()
+        self.source = source
+        self.buffer = TickBuffer(capacity=self.model.capacity)
+        self.model.set_columns(source.columns)
+        source.start(self.buffer.push)
+        self._timer.start()
+
+    def stop(self):
+        """Stop the running stream, if any."""
+        self._timer.stop()
+        if self.source is not None:
+            self.source.stop()
+            self.source = None
+
+    def is_running(self):
+        """Return True while a stream is running."""
+        return self.source is not None
+
+    def flush(self):
+        """Move the ticks buffered since the last frame into the model."""
+        ticks = self.buffer.drain()
+        if not ticks:
+            return
+        with span("stream.flush", ticks=len(ticks)):
+            self.model.append_ticks(ticks)
+        count("stream.ticks", len(ticks))
+        self.flushed.emit(len(ticks))
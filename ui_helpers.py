@@ -1,4 +1,4 @@
-from PyQt6.QtWidgets import QMenuBar, QToolBar, QStatusBar
+from PyQt6.QtWidgets import QMenuBar, QToolBar, QStatusBar, QProgressBar, QLabel
 from PyQt6.QtGui import QAction
 
 
@@ -23,6 +23,7 @@ def init_menu_bar(parent):
     help_menu.addAction(about_action)
 
     parent.setMenuBar(menu_bar)
+    return menu_bar
 
 
 def init_tool_bar(parent):
@@ -47,3 +48,43 @@ def init_status_bar(parent):
     status_bar = QStatusBar(parent)
     parent.setStatusBar(status_bar)
     status_bar.showMessage("Ready")
+    return status_bar
+
+
+def init_timing_label(status_bar):
+    """Add a permanent label for the latest hot-path timings to the status bar."""
+    timing_label = QLabel(status_bar)
+    status_bar.addPermanentWidget(timing_label)
+    return timing_label
+
+
+def connect_loader_status(loader, status_bar):
+    """Report the progress of a CsvLoader in the status bar."""
+    progress_bar = QProgressBar(status_bar)
+    progress_bar.setRange(0, 100)
+    progress_bar.setMaximumWidth(150)
+    progress_bar.hide()
+    status_bar.addPermanentWidget(progress_bar)
+
+    def on_started(channel, file_path):
+        progress_bar.setValue(0)
+        progress_bar.show()
+        status_bar.showMessage(f"Loading {file_path}...")
+
+    def on_progress(channel, percent):
+        progress_bar.setValue(percent)
+
+    def on_loaded(channel, file_path, result):
+        progress_bar.setVisible(loader.is_busy())
+        # Only tables have a row count; other results (such as the symbol index) do not
+        rows = getattr(result, "shape", None)
+        status_bar.showMessage(f"Loaded {rows[0]} rows from {file_path}" if rows else f"Loaded {file_path}")
+
+    def on_failed(channel, file_path, error):
+        progress_bar.setVisible(loader.is_busy())
+        status_bar.showMessage(f"Failed to load {file_path}")
+
+    loader.started.connect(on_started)
+    loader.progress.connect(on_progress)
+    loader.loaded.connect(on_loaded)
+    loader.failed.connect(on_failed)